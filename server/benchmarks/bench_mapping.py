@@ -0,0 +1,100 @@
+"""
+Benchmark of the transcription-to-diarization alignment.
+
+Compares the sweep-line `align_segments` against the previous pairwise
+implementation on synthetic meetings of growing length.
+
+Run from the server directory:
+    python -m benchmarks.bench_mapping
+"""
+import random
+import time
+from typing import List, Dict
+
+from utils.alignment_utils import align_segments
+
+
+def generate_segments(num_segments: int, seed: int = 0):
+    """
+    Generate a synthetic meeting with Whisper-like and pyannote-like segments.
+
+    Args:
+        num_segments (int): Number of segments on each side.
+        seed (int): Random seed.
+
+    Returns:
+        tuple: (transcription, diarization) segment lists sorted by start time.
+    """
+    rng = random.Random(seed)
+    speakers = [f"SPEAKER_{i:02d}" for i in range(6)]
+
+    transcription = []
+    t = 0.0
+    for i in range(num_segments):
+        duration = rng.uniform(1.0, 8.0)
+        transcription.append({"start": t, "end": t + duration, "text": f"sentence {i}"})
+        t += duration + rng.uniform(0.0, 0.5)
+
+    diarization = []
+    t = 0.0
+    for _ in range(num_segments):
+        duration = rng.uniform(0.5, 8.0)
+        diarization.append({"start": t, "end": t + duration, "speaker": rng.choice(speakers)})
+        # Occasionally let the next turn start before this one ends (overlapped speech)
+        t += duration - rng.uniform(0.0, 0.3) if rng.random() < 0.2 else duration + rng.uniform(0.0, 0.5)
+
+    return transcription, diarization
+
+
+def align_segments_pairwise(transcription: List[Dict], diarization: List[Dict], tolerance: float = 0.5) -> List[Dict]:
+    """
+    The previous O(n*m) implementation, kept as the reference.
+    """
+    unified_transcript = []
+    for trans in transcription:
+        overlapping_segments = [
+            dia for dia in diarization
+            if max(dia['start'], trans['start']) - min(dia['end'], trans['end']) < tolerance
+        ]
+        if not overlapping_segments:
+            unified_transcript.append({"start": trans['start'], "end": trans['end'], "speaker": "UNKNOWN", "text": trans['text']})
+            continue
+        for dia in overlapping_segments:
+            overlap_start = max(dia['start'], trans['start'])
+            overlap_end = min(dia['end'], trans['end'])
+            if overlap_start < overlap_end:
+                unified_transcript.append({"start": overlap_start, "end": overlap_end, "speaker": dia['speaker'], "text": trans['text']})
+
+    merged_transcript = []
+    for seg in unified_transcript:
+        if merged_transcript and seg['speaker'] == merged_transcript[-1]['speaker']:
+            merged_transcript[-1]['end'] = seg['end']
+            merged_transcript[-1]['text'] += " " + seg['text']
+        else:
+            merged_transcript.append(seg)
+    return merged_transcript
+
+
+def time_call(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'segments':>10} {'sweep (ms)':>12} {'pairwise (ms)':>14} {'speedup':>9}")
+    for num_segments in (100, 500, 1000, 2000, 5000):
+        transcription, diarization = generate_segments(num_segments)
+        assert align_segments(transcription, diarization) == align_segments_pairwise(transcription, diarization)
+
+        sweep = time_call(align_segments, transcription, diarization)
+        # The pairwise version gets too slow to repeat on the largest inputs
+        pairwise = time_call(align_segments_pairwise, transcription, diarization, repeat=1)
+        print(f"{num_segments:>10} {sweep * 1000:>12.2f} {pairwise * 1000:>14.2f} {pairwise / sweep:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
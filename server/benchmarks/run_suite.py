@@ -0,0 +1,257 @@
+"""
+Offline benchmark suite of the processing pipeline.
+
+Runs every stage on synthetic inputs with the local stand-ins from
+`benchmarks.stubs` in place of the models, Groq, Elasticsearch and SMTP,
+writes the timings as JSON and compares them against a saved baseline.
+
+Run from the server directory:
+    python -m benchmarks.run_suite --output bench.json
+    python -m benchmarks.run_suite --baseline benchmarks/baseline.json --tolerance 0.2
+
+The exit code is 1 when a benchmark is slower than its baseline by more than the tolerance.
+
+`benchmarks/baseline.json` holds the reference timings, measured with the stub
+models. process_file needs the ffmpeg binary and torch, like the application.
+Benchmarks missing from the baseline are reported but never fail the comparison.
+Timings depend on the machine, so regenerate the baseline on the machine that
+runs the check, and refresh it in the same change whenever a change is expected
+to alter a timing:
+    python -m benchmarks.run_suite --repeat 15 --save-baseline benchmarks/baseline.json
+"""
+import io
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.bench_mapping import generate_segments
+from benchmarks.stubs import (
+    InMemoryElasticsearchNode, create_benchmark_es_client, generate_audio, generate_text, install_stubs
+)
+
+
+def measure(func: Callable[[], None], repeat: int) -> dict:
+    """
+    Run a benchmark several times after one warm-up run.
+
+    Returns:
+        dict: Median, minimum and maximum duration in milliseconds.
+    """
+    func()
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return {
+        "median_ms": round(statistics.median(durations), 3),
+        "min_ms": round(min(durations), 3),
+        "max_ms": round(max(durations), 3),
+        "repeat": repeat,
+    }
+
+
+def generate_formatted_segments(num_segments: int, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {"start": i * 5.0, "end": i * 5.0 + 4.5, "speaker": f"SPEAKER_{rng.randrange(4):02d}", "text": generate_text(rng, rng.randint(10, 400))}
+        for i in range(num_segments)
+    ]
+
+
+def bench_mapping(repeat: int) -> dict:
+    from utils.diarization_utils import Diarization
+
+    diarization = Diarization()
+    results = {}
+    for num_segments in (500, 2000, 10000):
+        transcription, diarized = generate_segments(num_segments)
+        results[f"mapping/{num_segments}"] = measure(
+            lambda: asyncio.run(diarization.map_transcription_to_diarization(transcription, diarized)), repeat
+        )
+    return results
+
+
+def bench_chunking(repeat: int) -> dict:
+    from utils.summarization_utils import summarizer
+
+    texts = [segment["text"] for segment in generate_formatted_segments(500)]
+    return {
+        "chunk_text/500": measure(lambda: [summarizer.chunk_text(text) for text in texts], repeat),
+        "chunk_texts_batched/500": measure(lambda: summarizer.chunk_texts(texts), repeat)
+    }
+
+
+def bench_embeddings(repeat: int) -> dict:
+    from config import settings
+    from utils.embedding_cache import EmbeddingCache
+    from utils.summarization_utils import summarizer
+
+    chunks = [segment["text"] for segment in generate_formatted_segments(500, seed=1)]
+
+    def embed_uncached():
+        # A fresh cache per run, so every chunk is encoded
+        summarizer.embedding_cache = EmbeddingCache(max_entries=settings.EMBEDDING_CACHE_SIZE)
+        summarizer.generate_embeddings(chunks)
+
+    results = {"generate_embeddings/500": measure(embed_uncached, repeat)}
+    summarizer.generate_embeddings(chunks)
+    results["generate_embeddings_cached/500"] = measure(lambda: summarizer.generate_embeddings(chunks), repeat)
+    return results
+
+
+def bench_store(repeat: int) -> dict:
+    from elasticsearch.serializer import JsonSerializer
+    import config.elasticsearch as es_config
+    from config import settings
+    from services.elasticsearch_service import elastic_service
+
+    rng = np.random.default_rng(0)
+    transcript_embeddings = []
+    for segment in generate_formatted_segments(1000, seed=2):
+        vector = rng.standard_normal(384).astype(np.float32)
+        transcript_embeddings.append({
+            "start": segment["start"],
+            "end": segment["end"],
+            "speaker": segment["speaker"],
+            "chunk": segment["text"],
+            "embedding": vector / np.linalg.norm(vector)
+        })
+
+    async def store():
+        await elastic_service.store_in_elastic("benchmark", "meeting.mp3", ["a@example.com"], transcript_embeddings, "summary")
+
+    # The stdlib JSON serializer is the client default, orjson the application one
+    variants = {
+        "store_in_elastic/1000": (None, False),
+        "store_in_elastic_stdlib_json/1000": (JsonSerializer(), False),
+        "store_in_elastic_float16/1000": (None, True),
+    }
+    application_client, float16 = es_config._es_client, settings.ES_VECTOR_FLOAT16
+    results = {}
+    try:
+        for name, (serializer, round_vectors) in variants.items():
+            settings.ES_VECTOR_FLOAT16 = round_vectors
+            es_config._es_client = create_benchmark_es_client(serializer=serializer) if serializer else application_client
+            InMemoryElasticsearchNode.reset()
+            results[name] = measure(lambda: asyncio.run(store()), repeat)
+            # Every run indexes one file
+            results[name]["request_bytes_per_file"] = InMemoryElasticsearchNode.bytes_received // (repeat + 1)
+    finally:
+        es_config._es_client, settings.ES_VECTOR_FLOAT16 = application_client, float16
+    return results
+
+
+def bench_process_file(repeat: int, audio_seconds: float = 300) -> dict:
+    from fastapi import UploadFile
+    from controllers.file_controller import file_controller
+    from models.pydantic_models import AudioVideoFileRequest
+    from services import file_processing_service, job_service
+
+    # Run every stage in threads of this process, where the stand-ins are installed
+    file_processing_service.transcription_executor = ThreadPoolExecutor(max_workers=1)
+    file_processing_service.diarization_executor = ThreadPoolExecutor(max_workers=1)
+    job_service.start(executor=ThreadPoolExecutor(max_workers=job_service.max_workers))
+
+    seeds = iter(range(repeat + 1))
+
+    async def process():
+        # The container is detected from the content, the name only has to pass validation
+        upload = UploadFile(file=io.BytesIO(generate_audio(audio_seconds, seed=next(seeds))), filename="meeting.mp3")
+        body = AudioVideoFileRequest(workspace_name="benchmark", participants=["a@example.com"])
+        jobs = await file_controller.process_file([upload], body)
+        job_id = jobs[0]["job_id"]
+        while job_service.get_job(job_id)["status"] not in ("completed", "failed"):
+            await asyncio.sleep(0.01)
+        job = job_service.get_job(job_id)
+        if job["status"] == "failed":
+            raise RuntimeError(f"Benchmark job failed: {job['error']}")
+        # Include the summary mail
+        await asyncio.gather(*file_controller._mail_tasks)
+
+    try:
+        return {f"process_file/{int(audio_seconds)}s": measure(lambda: asyncio.run(process()), repeat)}
+    finally:
+        # Stop the job pool and its event pump, and the stage threads
+        job_service.shutdown()
+        file_processing_service.shutdown()
+
+
+BENCHMARKS = {
+    "mapping": bench_mapping,
+    "chunking": bench_chunking,
+    "embeddings": bench_embeddings,
+    "store": bench_store,
+    "process_file": bench_process_file,
+}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    List the benchmarks whose median is slower than the baseline by more than `tolerance`.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        ratio = result["median_ms"] / reference["median_ms"] if reference["median_ms"] else 1.0
+        result["baseline_median_ms"] = reference["median_ms"]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: {result['median_ms']:.2f} ms vs {reference['median_ms']:.2f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run, all by default.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--embedding-model", help="Small local SentenceTransformer model to use instead of the stub encoder.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline, 0.2 = 20%%.")
+    parser.add_argument("--save-baseline", help="Write the results as the new baseline.")
+    args = parser.parse_args()
+
+    install_stubs(args.embedding_model)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", file=sys.stderr)
+        results.update(BENCHMARKS[name](args.repeat))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file)["results"], args.tolerance)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "embedding_model": args.embedding_model or "stub",
+        "results": results,
+        "regressions": regressions,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as output_file:
+            output_file.write(output)
+
+    if regressions:
+        print("Regressions against the baseline:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Local stand-ins for the models and external services used by the pipeline.
+
+They keep the shapes and call signatures the application code relies on, so
+the benchmarks exercise the real application code paths without model
+downloads, Groq, Elasticsearch or an SMTP server.
+"""
+import io
+import re
+import json
+import time
+import wave
+import asyncio
+import hashlib
+import random
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+from elastic_transport import ApiResponseMeta, BaseAsyncNode, HttpHeaders
+from elastic_transport._node import NodeApiResponse
+
+from utils.asr_backends import ASRBackend
+
+WORDS = (
+    "the project deadline budget review design team customer release meeting "
+    "action item follow up decision quarter roadmap feature bug test deploy "
+    "we should move forward with this plan next week and check the numbers"
+).split()
+
+
+def generate_text(rng: random.Random, num_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(num_words))
+
+
+def generate_audio(duration: float, seed: int = 0, sample_rate: int = 16000) -> bytes:
+    """
+    Generate a WAV recording of tone bursts separated by silences.
+
+    Args:
+        duration (float): Length of the recording in seconds.
+        seed (int): Random seed, different seeds give different content hashes.
+        sample_rate (int): Sample rate of the recording.
+
+    Returns:
+        bytes: The encoded 16-bit mono WAV file.
+    """
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(duration * sample_rate), dtype=np.float32)
+    position = 0
+    while position < len(samples):
+        burst = int(rng.uniform(0.5, 4.0) * sample_rate)
+        t = np.arange(min(burst, len(samples) - position)) / sample_rate
+        samples[position:position + len(t)] = 0.3 * np.sin(2 * np.pi * rng.uniform(100, 300) * t)
+        position += len(t) + int(rng.uniform(0.2, 1.0) * sample_rate)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+class HashTokenizer:
+    """
+    Whitespace tokenizer with the subset of the Hugging Face fast tokenizer API used by the summarizer.
+    """
+
+    is_fast = True
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._words: List[str] = []
+
+    def _encode(self, text: str):
+        ids, offsets = [], []
+        for match in re.finditer(r"\S+", text):
+            word = match.group()
+            if word not in self._ids:
+                self._ids[word] = len(self._words)
+                self._words.append(word)
+            ids.append(self._ids[word])
+            offsets.append(match.span())
+        return ids, offsets
+
+    def __call__(self, text: Union[str, List[str]], return_offsets_mapping: bool = False, **kwargs) -> dict:
+        encodings = [self._encode(text)] if isinstance(text, str) else [self._encode(item) for item in text]
+        result = {"input_ids": [ids for ids, _ in encodings]}
+        if return_offsets_mapping:
+            result["offset_mapping"] = [offsets for _, offsets in encodings]
+        if isinstance(text, str):
+            result = {key: value[0] for key, value in result.items()}
+        return result
+
+    def num_special_tokens_to_add(self, pair: bool = False) -> int:
+        return 2
+
+    def decode(self, ids: List[int], **kwargs) -> str:
+        return " ".join(self._words[i] for i in ids)
+
+
+class StubSentenceTransformer:
+    """
+    Stand-in for SentenceTransformer producing deterministic unit vectors.
+
+    `seconds_per_chunk` simulates the encoder cost so batching changes stay visible.
+    """
+
+    dimension = 384
+    seconds_per_chunk = 0.0005
+
+    def __init__(self):
+        self.tokenizer = HashTokenizer()
+        self.max_seq_length = 256
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        time.sleep(self.seconds_per_chunk * len(sentences))
+        vectors = np.empty((len(sentences), self.dimension), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            seed = int.from_bytes(hashlib.sha1(sentence.encode()).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+            vectors[row] = vector / np.linalg.norm(vector)
+        return vectors
+
+
+class StubChatGroq:
+    """
+    Stand-in for ChatGroq answering after a fixed latency.
+    """
+
+    latency = 0.2
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def ainvoke(self, prompt: str):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=f"Summary of {len(prompt.split())} words.")
+
+
+class StubASRBackend(ASRBackend):
+    """
+    Stand-in ASR backend emitting one segment every few seconds of audio.
+
+    `simulated_real_time_factor` simulates the decoding cost relative to the audio length.
+    """
+
+    name = "stub"
+    simulated_real_time_factor = 0.02
+
+    def load(self) -> "StubASRBackend":
+        return self
+
+    def _transcribe(self, audio: np.ndarray, on_segment: Callable[[Dict], None]) -> List[Dict]:
+        duration = len(audio) / 16000
+        time.sleep(duration * self.simulated_real_time_factor)
+        rng = random.Random(len(audio))
+        segments, start = [], 0.0
+        while start < duration:
+            end = min(duration, start + rng.uniform(2.0, 8.0))
+            segments.append({"id": len(segments), "start": start, "end": end, "text": generate_text(rng, 20)})
+            on_segment(segments[-1])
+            start = end
+        return segments
+
+
+class StubAnnotation:
+    def __init__(self, tracks: list):
+        self._tracks = tracks
+
+    def itertracks(self, yield_label: bool = False):
+        for start, end, speaker in self._tracks:
+            yield SimpleNamespace(start=start, end=end), None, speaker
+
+
+class StubDiarizationPipeline:
+    """
+    Stand-in for the pyannote pipeline alternating between a few speakers.
+    """
+
+    real_time_factor = 0.01
+
+    def __call__(self, audio: Union[str, dict], **kwargs) -> StubAnnotation:
+        duration = audio["waveform"].shape[-1] / audio["sample_rate"]
+        time.sleep(duration * self.real_time_factor)
+        rng = random.Random(int(duration))
+        tracks, start = [], 0.0
+        while start < duration:
+            end = min(duration, start + rng.uniform(1.0, 10.0))
+            tracks.append((start, end, f"SPEAKER_{rng.randrange(4):02d}"))
+            start = end
+        return StubAnnotation(tracks)
+
+
+class InMemoryElasticsearchNode(BaseAsyncNode):
+    """
+    Transport node serving the Elasticsearch API calls of the application from memory.
+
+    Requests still go through the real client and its serializers, so the
+    serialization cost and the request sizes are measured as in production.
+    """
+
+    indices: Dict[str, Dict[str, dict]] = {}
+    bytes_received = 0
+    requests = 0
+
+    @classmethod
+    def reset(cls):
+        cls.indices = {}
+        cls.bytes_received = 0
+        cls.requests = 0
+
+    async def perform_request(self, method, target, body=None, headers=None, request_timeout=None) -> NodeApiResponse:
+        type(self).requests += 1
+        type(self).bytes_received += len(body or b"")
+        status, response = self._handle(method, target.split("?")[0].strip("/").split("/"), body)
+        meta = ApiResponseMeta(
+            status=status,
+            http_version="1.1",
+            headers=HttpHeaders({"content-type": "application/json", "x-elastic-product": "Elasticsearch"}),
+            duration=0.0,
+            node=self.config
+        )
+        return NodeApiResponse(meta, json.dumps(response).encode())
+
+    async def close(self):
+        pass
+
+    def _handle(self, method: str, path: List[str], body: Optional[bytes]):
+        indices = type(self).indices
+        if path == [""]:
+            return 200, {"version": {"number": "8.17.0", "build_flavor": "default"}, "tagline": "You Know, for Search"}
+
+        if path == ["_bulk"]:
+            lines = body.decode().splitlines()
+            items = []
+            for action_line, source_line in zip(lines[::2], lines[1::2]):
+                action = json.loads(action_line)["index"]
+                indices.setdefault(action["_index"], {})[action["_id"]] = json.loads(source_line)
+                items.append({"index": {"_index": action["_index"], "_id": action["_id"], "status": 201}})
+            return 200, {"took": 0, "errors": False, "items": items}
+
+        index = path[0]
+        if len(path) == 1:
+            if method == "HEAD":
+                return (200 if index in indices else 404), {}
+            if method == "PUT":
+                if index in indices:
+                    return 400, {"error": {"type": "resource_already_exists_exception"}, "status": 400}
+                indices[index] = {}
+                return 200, {"acknowledged": True, "index": index}
+
+        if path[1] == "_doc":
+            documents = indices.get(index)
+            if method == "GET":
+                if documents is None or path[2] not in documents:
+                    return 404, {"_index": index, "_id": path[2], "found": False}
+                return 200, {"_index": index, "_id": path[2], "found": True, "_source": documents[path[2]]}
+            indices.setdefault(index, {})[path[2]] = json.loads(body)
+            return 201, {"_index": index, "_id": path[2], "result": "created"}
+
+        if path[1] == "_search":
+            if index not in indices:
+                return 404, {"error": {"type": "index_not_found_exception"}, "status": 404}
+            hits = [
+                {"_index": index, "_id": doc_id, "_score": 1.0, "_source": source}
+                for doc_id, source in indices[index].items()
+            ]
+            return 200, {"hits": {"total": {"value": len(hits), "relation": "eq"}, "hits": hits[:10]}}
+
+        return 400, {"error": {"type": "unsupported_benchmark_request", "reason": f"{method} {'/'.join(path)}"}, "status": 400}
+
+
+def create_benchmark_es_client(**kwargs):
+    """
+    Create an application Elasticsearch client served by the in-memory node.
+
+    Args:
+        **kwargs: Overrides of the client arguments, e.g. another serializer.
+    """
+    from config.elasticsearch import create_es_client
+    return create_es_client(["http://localhost:9200"], node_class=InMemoryElasticsearchNode, **kwargs)
+
+
+def install_stubs(embedding_model: Optional[str] = None):
+    """
+    Replace the models and external services with the local stand-ins.
+
+    Must run before the services are imported, since they read some of
+    the settings at import time.
+
+    Args:
+        embedding_model (str): Name of a small local SentenceTransformer model to
+            benchmark the real encoder with, None to use the stub encoder.
+    """
+    from config.settings import settings
+    # Every run processes new content and starts with a cold embedding cache
+    settings.DEDUPE_UPLOADS = False
+    settings.EMBEDDING_CACHE_DIR = None
+    if embedding_model:
+        settings.EMBEDDING_MODEL = embedding_model
+
+    import config.elasticsearch as es_config
+    es_config._es_client = create_benchmark_es_client()
+
+    # The loaders are registered on import, the stand-ins replace them before first use
+    from models.model_registry import model_registry
+    from utils.whisper_utils import WHISPER_MODEL_KEY
+    from utils.diarization_utils import DIARIZATION_MODEL_KEY
+    from utils.summarization_utils import EMBEDDING_MODEL_KEY, summarizer
+    model_registry.register(WHISPER_MODEL_KEY, StubASRBackend)
+    model_registry.register(DIARIZATION_MODEL_KEY, StubDiarizationPipeline)
+    if not embedding_model:
+        model_registry.register(EMBEDDING_MODEL_KEY, StubSentenceTransformer)
+    summarizer._llm = StubChatGroq()
+
+    from utils.mail_utils import mail_sender
+
+    async def send(recipients: List[str], subject: str, html: str):
+        await asyncio.sleep(0.01)
+
+    mail_sender.send = send
@@ -1,3 +1,3 @@
-from .elasticsearch import get_es_client
+from .elasticsearch import get_es_client, close_es_client
 from .settings import settings
 from .database import db_instance
\ No newline at end of file
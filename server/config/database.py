@@ -1,17 +1,42 @@
+import pymongo
 from pymongo import MongoClient
 import urllib.parse
 from config import settings
 
 class Database:
     def __init__(self):
-        username = urllib.parse.quote_plus(settings.MONGO_USERNAME)
-        password = urllib.parse.quote_plus(settings.MONGO_PASSWORD)
+        self._client = None
+
+    @property
+    def client(self) -> MongoClient:
+        """
+        The MongoDB client, created on first use.
+
+        MongoClient connects in the background, so creating it does not block
+        startup; use `ping` to check that the server is actually reachable.
+        """
+        if self._client is None:
+            username = urllib.parse.quote_plus(settings.MONGO_USERNAME)
+            password = urllib.parse.quote_plus(settings.MONGO_PASSWORD)
+            try:
+                self._client = MongoClient(settings.DATABASE_URL % (username, password))
+            except Exception as e:
+                raise ConnectionError(f"Unable to connect to MongoDB: {str(e)}")
+        return self._client
+
+    def ping(self, timeout: float = settings.HEALTH_CHECK_TIMEOUT) -> bool:
+        """
+        Check that the MongoDB server answers within `timeout` seconds.
+
+        The timeout also bounds the server selection, which otherwise waits 30 seconds
+        for an unreachable server.
+        """
         try:
-            self.client = MongoClient(settings.DATABASE_URL % (username, password))
-            conn_info = self.client.server_info()
-            print(f"Connected to MongoDB: Version {conn_info.get('version')}")
-        except Exception as e:
-            raise ConnectionError(f"Unable to connect to MongoDB: {str(e)}")
+            with pymongo.timeout(timeout):
+                self.client.admin.command("ping")
+            return True
+        except Exception:
+            return False
 
     def get_database(self, db_name: str):
         return self.client[db_name]
@@ -1,7 +1,60 @@
+from typing import List, Optional
+
 from config.settings import settings
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.serializer import OrjsonSerializer
+
+_es_client = None
+
+
+def create_es_client(hosts: Optional[List[str]] = None, **kwargs) -> AsyncElasticsearch:
+    """
+    Create an async Elasticsearch client with the application settings.
+
+    Documents are encoded with orjson, which writes NumPy arrays such as the
+    chunk embeddings natively instead of converting them one float at a time.
+    The bulk helper encodes its actions with the same serializer.
+
+    Args:
+        hosts (List[str]): Nodes to connect to, the configured ELASTIC_URL by default.
+        **kwargs: Overrides of the client arguments.
+
+    Returns:
+        AsyncElasticsearch: A new client.
+    """
+    options = dict(
+        connections_per_node=settings.ES_CONNECTIONS_PER_NODE,
+        request_timeout=settings.ES_REQUEST_TIMEOUT,
+        max_retries=settings.ES_MAX_RETRIES,
+        retry_on_timeout=True,
+        serializer=OrjsonSerializer()
+    )
+    options.update(kwargs)
+    return AsyncElasticsearch(hosts or [settings.ELASTIC_URL], **options)
 
 
 # Initialize the Elasticsearch client
-def get_es_client():
-    return Elasticsearch([settings.ELASTIC_URL])
\ No newline at end of file
+def get_es_client() -> AsyncElasticsearch:
+    """
+    Get the process-wide async Elasticsearch client.
+
+    The client is created once and shared, so every service reuses the
+    same pool of keep-alive connections.
+
+    Returns:
+        AsyncElasticsearch: The shared client.
+    """
+    global _es_client
+    if _es_client is None:
+        _es_client = create_es_client()
+    return _es_client
+
+
+async def close_es_client():
+    """
+    Close the shared client and its connection pool.
+    """
+    global _es_client
+    if _es_client is not None:
+        await _es_client.close()
+        _es_client = None
@@ -10,6 +10,18 @@ class AppSettings:
     def __init__(self):
         load_dotenv()
         self.ELASTIC_URL = os.getenv("ELASTIC_URL")
+        self.ES_CONNECTIONS_PER_NODE = int(os.getenv("ES_CONNECTIONS_PER_NODE", "25"))
+        self.ES_REQUEST_TIMEOUT = float(os.getenv("ES_REQUEST_TIMEOUT", "30"))
+        self.ES_MAX_RETRIES = int(os.getenv("ES_MAX_RETRIES", "3"))
+        self.ES_BULK_CHUNK_SIZE = int(os.getenv("ES_BULK_CHUNK_SIZE", "500"))
+        # Quantized HNSW keeps chunk vectors at a quarter of the float32 memory
+        self.ES_VECTOR_INDEX_TYPE = os.getenv("ES_VECTOR_INDEX_TYPE", "int8_hnsw")
+        # Round the chunk vectors to float16 precision before sending them, ~30% smaller bulk requests
+        self.ES_VECTOR_FLOAT16 = os.getenv("ES_VECTOR_FLOAT16", "false").lower() == "true"
+        self.WORKSPACE_CACHE_TTL = int(os.getenv("WORKSPACE_CACHE_TTL", "300"))
+        self.SEARCH_NUM_CANDIDATES = int(os.getenv("SEARCH_NUM_CANDIDATES", "100"))
+        self.SEARCH_RANK_WINDOW = int(os.getenv("SEARCH_RANK_WINDOW", "50"))
+        self.SEARCH_RRF_RANK_CONSTANT = int(os.getenv("SEARCH_RRF_RANK_CONSTANT", "60"))
 
         self.GOOGLE_CLIENT_ID = os.getenv("CLIENT_ID")
         self.GOOGLE_CLIENT_SECRET = os.getenv("CLIENT_SECRET")
@@ -22,13 +34,65 @@ class AppSettings:
         self.PORT = os.getenv("MAIL_PORT")
         self.USERNAME = os.getenv("MAIL_USERNAME")
         self.PASSWORD = os.getenv("MAIL_PASSWORD")
+        self.MAIL_POOL_SIZE = int(os.getenv("MAIL_POOL_SIZE", "2"))
+        self.MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "50"))
 
         self.GROQ_LLM_NAME = os.getenv("GROQ_MODEL_NAME")
         self.GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-        self.WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL_NAME") 
+        self.SUMMARY_MAP_REDUCE_THRESHOLD = int(os.getenv("SUMMARY_MAP_REDUCE_THRESHOLD", "6000"))
+        self.SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+        self.SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+        self.WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL_NAME", "medium")
+        # "openai-whisper" or "faster-whisper" (CTranslate2)
+        self.ASR_BACKEND = os.getenv("ASR_BACKEND", "openai-whisper")
+        self.ASR_DEVICE = os.getenv("ASR_DEVICE", "cpu")
+        self.ASR_COMPUTE_TYPE = os.getenv("ASR_COMPUTE_TYPE", "int8")
+        self.ASR_BEAM_SIZE = int(os.getenv("ASR_BEAM_SIZE", "5"))
+        # openai-whisper only returns segments once its input is decoded, it is fed windows
+        # of about this length cut at silences so segments stream out; 0 decodes in one call
+        self.ASR_STREAM_WINDOW_SECONDS = float(os.getenv("ASR_STREAM_WINDOW_SECONDS", "30"))
         self.DIARIZATION_MODEL_NAME = os.getenv("DIARIZATION_MODEL_NAME")
         self.HUGGING_FACE_ACCESS_TOKEN = os.getenv("HUGGING_FACE_ACCESS_TOKEN")
         self.EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+        self.EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        self.EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))
+        self.EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR")
+        # Load the models in the background at startup instead of on the first request
+        self.PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+        # Seconds the readiness probe waits for Elasticsearch and MongoDB, without retries
+        self.HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+
+        self.UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+        self.UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+        self.MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", "0"))
+        # Decoded audio is memory-mapped from here, point it to disk for very long recordings
+        self.PCM_BUFFER_DIR = os.getenv("PCM_BUFFER_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else self.UPLOAD_DIR)
+
+        self.PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+        self.JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+        self.DEDUPE_UPLOADS = os.getenv("DEDUPE_UPLOADS", "true").lower() == "true"
+
+        # Transcription and diarization run side by side in every pipeline worker
+        default_stage_threads = str(max(1, (os.cpu_count() or 2) // (2 * self.PIPELINE_WORKERS)))
+        self.ASR_TORCH_THREADS = int(os.getenv("ASR_TORCH_THREADS", default_stage_threads))
+        self.DIARIZATION_TORCH_THREADS = int(os.getenv("DIARIZATION_TORCH_THREADS", default_stage_threads))
+        self.DIARIZATION_SEGMENTATION_BATCH_SIZE = int(os.getenv("DIARIZATION_SEGMENTATION_BATCH_SIZE", "32"))
+        self.DIARIZATION_EMBEDDING_BATCH_SIZE = int(os.getenv("DIARIZATION_EMBEDDING_BATCH_SIZE", "32"))
+        # How the participant count bounds the speaker clustering: "exact" fixes the
+        # number of speakers, "range" allows DIARIZATION_SPEAKER_MARGIN more or less
+        # (invitees who stayed silent, people sharing a microphone), "none" ignores it
+        self.DIARIZATION_SPEAKER_HINT = os.getenv("DIARIZATION_SPEAKER_HINT", "range")
+        self.DIARIZATION_SPEAKER_MARGIN = int(os.getenv("DIARIZATION_SPEAKER_MARGIN", "1"))
+
+        # 1 transcribes the whole file at once. With more, long recordings are cut at silences
+        # and the windows transcribed by ASR_WORKERS processes, which share the ASR thread
+        # budget but each load their own copy of the model in every pipeline worker
+        self.ASR_WORKERS = int(os.getenv("ASR_WORKERS", "1"))
+        self.ASR_MIN_WINDOW_SECONDS = float(os.getenv("ASR_MIN_WINDOW_SECONDS", "30"))
+        self.ASR_MAX_WINDOW_SECONDS = float(os.getenv("ASR_MAX_WINDOW_SECONDS", "180"))
+        self.VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+        self.VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "35"))
+        self.VAD_MIN_SILENCE_SECONDS = float(os.getenv("VAD_MIN_SILENCE_SECONDS", "0.3"))
 
         self.MONGO_INITDB_DATABASE = os.getenv("MONGO_INITDB_DATABASE")
         self.DATABASE_URL = os.getenv("DATABASE_URL")
@@ -1,3 +1,5 @@
 from .auth_controller import auth_controller
 from .file_controller import file_controller
-from .workspace_controller import workspace_controller
\ No newline at end of file
+from .workspace_controller import workspace_controller
+from .job_controller import job_controller
+from .search_controller import search_controller
@@ -20,9 +20,14 @@ logger = logging.getLogger("authcontroller")
 
 
 class AuthController:
-    def __init__(self):
-        self.es_client = get_es_client()
-        self.user_collection = db_instance.get_collection(
+    @property
+    def es_client(self):
+        return get_es_client()
+
+    @property
+    def user_collection(self):
+        # Resolved on use so importing the controller does not touch MongoDB
+        return db_instance.get_collection(
             settings.MONGO_INITDB_DATABASE, "users"
         )
 
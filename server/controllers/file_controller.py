@@ -1,11 +1,14 @@
-from fastapi import UploadFile, HTTPException, Depends, BackgroundTasks
+from fastapi import UploadFile, HTTPException, Depends
 from fastapi.responses import FileResponse
-from typing import List
+from functools import partial
+from typing import List, Optional
 from models.pydantic_models import AudioVideoFileRequest
-from services import file_processing_service, elastic_service
+from services import file_processing_service, elastic_service, job_service, workspace_resolver
+from utils.helper import encode_cursor, decode_cursor
 from utils.mail_utils import send_email
-from starlette.concurrency import run_in_threadpool
+from utils.metrics import stage_timer
 
+import asyncio
 import logging
 import os
 
@@ -16,86 +19,142 @@ class FileController:
     def __init__(self):
         self.file_service = file_processing_service
         self.elastic_service = elastic_service
+        self.job_service = job_service
+        self.workspace_resolver = workspace_resolver
+        self._mail_tasks = set()
     
-    async def get_files(self, workspace_name: str):
+    async def get_files(self, workspace_name: str, size: int = 50, cursor: Optional[str] = None):
         """
-        Retrieves a list of files from the specified workspace index in Elasticsearch.
+        Retrieves a page of files from the specified workspace index in Elasticsearch.
 
-        :param workspace_name: The name of the workspace, which is also the index name in Elasticsearch.
-        :return: List of files in the specified workspace.
+        :param workspace_name: The name of the workspace, or its index name in Elasticsearch.
+        :param size: Maximum number of files to return.
+        :param cursor: Opaque cursor returned as `next_cursor` by the previous page.
+        :return: The files of the page, the total number of files and the cursor of the next page.
         """
+        if not 1 <= size <= 1000:
+            raise HTTPException(status_code=400, detail="size must be between 1 and 1000.")
+
+        try:
+            search_after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+
         try:
-            # Perform an Elasticsearch search query on the specified workspace index
-            query = {
-                "query": {
-                    "match_all": {}
+            index_name = await self.workspace_resolver.resolve_index(workspace_name)
+            response = await self.elastic_service.list_files(index_name, size=size, search_after=search_after)
+
+            hits = response['hits']['hits']
+            files = [
+                {
+                    "filename": hit["_source"]["filename"],
+                    "file_id": hit["_source"]["file_id"]
                 }
+                for hit in hits
+            ]
+            return {
+                "files": files,
+                "total": response['hits']['total']['value'],
+                # A full page means there may be more files after the last hit
+                "next_cursor": encode_cursor(hits[-1]["sort"]) if len(hits) == size else None
             }
-            
-            # Query Elasticsearch for all documents in the workspace index
-            response = await self.elastic_service.es.search(index=workspace_name, body=query)
-
-            # Check if we got results
-            if response['hits']['total']['value'] > 0:
-                files = []
-                for hit in response['hits']['hits']:
-                    # Extract file details
-                    file_data = hit["_source"]
-                    files.append({
-                        "filename": file_data["filename"],
-                        "file_id": file_data["file_id"]
-                    })
-                return files
-            else:
-                return []  # Return an empty list if no files are found
         except Exception as e:
-            print(f"Error fetching files from workspace '{workspace_name}': {e}")
-            return []
+            logger.error(f"Error fetching files from workspace '{workspace_name}': {e}")
+            return {"files": [], "total": 0, "next_cursor": None}
     
-    async def process_file(self, background_tasks: BackgroundTasks, files: List[UploadFile], body: AudioVideoFileRequest = Depends(), ):
-        
+    async def process_file(self, files: List[UploadFile], body: AudioVideoFileRequest = Depends()):
+        """
+        Save the uploaded files and queue a processing job for each of them.
+
+        :param files: Uploaded audio or video files.
+        :param body: Workspace name and meeting participants.
+        :return: The job ID of every queued file, to be polled on /jobs/{job_id}.
+        """
+        # Validate file type based on content type or extension 
+        valid_audio_video_extensions = [".mp3", ".mp4", ".avi"]
+
+        for file in files:
+            file_extension = os.path.splitext(file.filename)[1].lower()
+            logger.info(f"Received file extension: {file_extension}")
+            if file_extension not in valid_audio_video_extensions + [".pdf"]:
+                raise HTTPException(status_code=400, detail="Unsupported file type.")
+
         try:
-            results = []
+            # Jobs store into the resolved workspace index
+            body.workspace_name = await self.workspace_resolver.resolve_index(body.workspace_name)
+
+            jobs = []
             for file in files:
                 file_extension = os.path.splitext(file.filename)[1].lower()
-                logger.info(f"Received file extension: {file_extension}")
-                
-                # Validate file type based on content type or extension 
-                valid_audio_video_extensions = [".mp3", ".mp4", ".avi"]
-
-                if file_extension in valid_audio_video_extensions:
-                    logger.info(f"Processing media file {file.filename}")
-                    media_results = await self.file_service.process_audio_video_files(file)
-                    
-                elif file_extension == ".pdf":
-                    pass
-                else:
-                    raise HTTPException(status_code=400, detail="Unsupported file type.")  
-                
-                # Store Transcript in Elasticsearch
-                file_id = await self.elastic_service.store_in_elastic(
-                    workspace_name=body.workspace_name,
-                    filename=file.filename,
-                    transcript=media_results.get("transcript",""),
-                    participants=body.participants,
-                    transcript_embeddings=media_results.get("embeddings",[])
+                if file_extension == ".pdf":
+                    continue
+
+                logger.info(f"Queueing media file {file.filename}")
+                with stage_timer("save"):
+                    saved_file = await self.file_service.save_file_temporarily(file)
+
+                job_id = self.job_service.create_job(
+                    file.filename, body.workspace_name, saved_file["content_hash"],
+                    # Every participant is a likely speaker of the recording
+                    num_participants=len(set(body.participants))
+                )
+                self.job_service.submit(
+                    job_id,
+                    saved_file["file_path"],
+                    partial(self.store_results, filename=file.filename, body=body)
                 )
 
-                background_tasks.add_task(self.schedule_mail, workspace_name=body.workspace_name, file_id=file_id, summary=media_results.get("summary",""))
-                
-                results.append({
+                jobs.append({
                     "filename": file.filename,
-                    "summary": media_results.get("summary",""),
-                    "file_id": file_id
+                    "job_id": job_id,
+                    "status": "queued"
                 })
-            return results
+            return jobs
+        except HTTPException:
+            raise
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error storing data in Elasticsearch: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error queueing files for processing: {str(e)}")
+
+    async def store_results(self, media_results: dict, filename: str, body: AudioVideoFileRequest) -> dict:
+        """
+        Store the pipeline output of a finished job and send the summary mail.
+
+        :param media_results: Summary, transcript and embeddings produced by the pipeline.
+        :param filename: Name of the processed file.
+        :param body: Workspace name and meeting participants.
+        :return: The job result returned to the client.
+        """
+        summary = media_results.get("summary","")
+
+        # Store the file summary and transcript chunks in Elasticsearch
+        with stage_timer("index", media_results.get("audio_seconds")):
+            file_id = await self.elastic_service.store_in_elastic(
+                workspace_name=body.workspace_name,
+                filename=filename,
+                participants=body.participants,
+                transcript_embeddings=media_results.get("embeddings",[]),
+                summary=summary
+            )
+
+        mail_task = asyncio.create_task(self.schedule_mail(workspace_name=body.workspace_name, file_id=file_id, summary=summary))
+        self._mail_tasks.add(mail_task)
+        mail_task.add_done_callback(self._mail_tasks.discard)
+
+        return {
+            "filename": filename,
+            "summary": summary,
+            "file_id": file_id
+        }
     
     async def schedule_mail(self,workspace_name: str, file_id: str, summary: str):
         try:
             logger.info(f"Scheduling email for {file_id} via gmail.")
-            await run_in_threadpool(send_email, workspace_name, file_id, summary, self.elastic_service)
+            logger.info("Begin file retrieval from elastic search.")
+            meeting_data = await self.elastic_service.retrieve_from_elastic(
+                workspace_name, file_id, fields=["filename", "participants"]
+            )
+            with stage_timer("mail"):
+                await send_email(meeting_data, summary)
             logger.info("Email successfully sent.")
             return {"message": "Email Scheduled to send successfully"}
         except Exception as e:
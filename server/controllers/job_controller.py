@@ -0,0 +1,100 @@
+from fastapi import HTTPException, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketDisconnect
+from services import job_service
+import json
+import logging
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class JobController:
+
+    def __init__(self):
+        self.job_service = job_service
+
+    async def get_job(self, job_id: str) -> dict:
+        """
+        Get the overall and per-stage status of a processing job.
+
+        Args:
+            job_id (str): The ID returned by /file/upload.
+
+        Returns:
+            dict: Job status, stage statuses and error message if the job failed.
+        """
+        job = self.job_service.get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+
+        return {key: value for key, value in job.items() if key != "result"}
+
+    async def get_job_result(self, job_id: str) -> dict:
+        """
+        Get the result of a completed processing job.
+
+        Args:
+            job_id (str): The ID returned by /file/upload.
+
+        Returns:
+            dict: The filename, summary and file ID of the processed file.
+        """
+        job = self.job_service.get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+        if job["status"] == "failed":
+            raise HTTPException(status_code=500, detail=f"Job {job_id} failed: {job['error']}")
+        if job["status"] != "completed":
+            raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job['status']}.")
+
+        return job["result"]
+
+    async def stream_job(self, job_id: str) -> StreamingResponse:
+        """
+        Stream the partial results of a job as server-sent events.
+
+        Transcript segments are pushed as they are decoded, then the speaker
+        turns once diarization is mapped, then the summary, and finally a
+        `completed` or `failed` event closing the stream.
+
+        Args:
+            job_id (str): The ID returned by /file/upload.
+
+        Returns:
+            StreamingResponse: A text/event-stream response.
+        """
+        if self.job_service.get_job(job_id) is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+
+        async def event_stream():
+            async for event in self.job_service.stream_events(job_id):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    async def stream_job_ws(self, websocket: WebSocket, job_id: str):
+        """
+        Stream the same events as `stream_job` over a WebSocket, one JSON message per event.
+
+        Args:
+            websocket (WebSocket): The client connection.
+            job_id (str): The ID returned by /file/upload.
+        """
+        if self.job_service.get_job(job_id) is None:
+            await websocket.close(code=1008, reason=f"Job {job_id} not found.")
+            return
+
+        await websocket.accept()
+        try:
+            async for event in self.job_service.stream_events(job_id):
+                await websocket.send_json(event)
+            await websocket.close()
+        except WebSocketDisconnect:
+            logger.info(f"Client stopped streaming job {job_id}.")
+
+job_controller = JobController()
@@ -0,0 +1,59 @@
+from fastapi import HTTPException
+from elasticsearch import NotFoundError
+from starlette.concurrency import run_in_threadpool
+from config import settings
+from services import elastic_service, workspace_resolver
+from utils.summarization_utils import summarizer
+import logging
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bound of num_candidates of an Elasticsearch kNN query
+MAX_NUM_CANDIDATES = 10000
+
+class SearchController:
+
+    def __init__(self):
+        self.elastic_service = elastic_service
+        self.workspace_resolver = workspace_resolver
+        self.summarizer = summarizer
+
+    async def search(self, workspace_name: str, query: str, k: int = 10, num_candidates: int = settings.SEARCH_NUM_CANDIDATES) -> list:
+        """
+        Hybrid semantic and keyword search over the transcripts of a workspace.
+
+        Args:
+            workspace_name (str): The workspace name or index ID.
+            query (str): The search query.
+            k (int): Number of results to return.
+            num_candidates (int): kNN candidates per shard, higher improves recall at the cost of latency.
+
+        Returns:
+            list: Matching transcript chunks with file ID, timestamps and highlighted text.
+        """
+        if not query.strip():
+            raise HTTPException(status_code=400, detail="Query cannot be empty.")
+        # Elasticsearch rejects anything outside these bounds
+        if not 1 <= k <= num_candidates <= MAX_NUM_CANDIDATES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"k and num_candidates must satisfy 1 <= k <= num_candidates <= {MAX_NUM_CANDIDATES}."
+            )
+
+        try:
+            # Query vectors go through the embedding cache, repeated queries are not re-encoded
+            query_vector = (await run_in_threadpool(self.summarizer.generate_embeddings, [query]))[0]
+            index_name = await self.workspace_resolver.resolve_index(workspace_name)
+            return await self.elastic_service.hybrid_search(
+                index_name, query, query_vector.tolist(), k=k, num_candidates=num_candidates
+            )
+        except NotFoundError:
+            # Nothing has been indexed in this workspace yet
+            return []
+        except Exception as e:
+            logger.error(f"Error searching workspace '{workspace_name}': {e}")
+            raise HTTPException(status_code=500, detail=f"Error searching workspace: {e}")
+
+search_controller = SearchController()
@@ -1,8 +1,55 @@
-from fastapi import FastAPI
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from config import get_es_client, close_es_client, db_instance, settings
+from models.model_registry import model_registry
 from routes.routes import router
+from services import job_service, workspace_resolver
+from utils.mail_utils import mail_sender
+from utils.metrics import REQUEST_LATENCY
+from utils.summarization_utils import summarizer, EMBEDDING_MODEL_KEY
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def warm_up():
+    """
+    Fill the caches and load the models in the background while requests are already served.
+    """
+    try:
+        await workspace_resolver.load_all()
+    except Exception as e:
+        logger.warning(f"Elasticsearch is not reachable at startup: {e}")
+
+    if not settings.PRELOAD_MODELS:
+        return
+    try:
+        # The API process only embeds search queries, the pipeline workers load everything
+        await run_in_threadpool(summarizer.warm_up)
+        await job_service.warm_up()
+        logger.info("Model warm-up completed.")
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_service.start()
+    warm_up_task = asyncio.create_task(warm_up())
+    yield
+    warm_up_task.cancel()
+    job_service.shutdown()
+    await mail_sender.close()
+    await close_es_client()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS Configuration
 app.add_middleware(
@@ -20,9 +67,67 @@ async def add_headers(request, call_next):
     response.headers["Cross-Origin-Embedder-Policy"] = "require-corp"
     return response
 
+@app.middleware("http")
+async def record_request_latency(request, call_next):
+    start_time = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so path parameters do not create new series
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status
+        ).observe(time.perf_counter() - start_time)
+
 # Include the PDF processing routes from the controller
 app.include_router(router)
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to Navio!!!"}
\ No newline at end of file
+    return {"message": "Welcome to Navio!!!"}
+
+@app.get("/models/stats")
+def model_stats():
+    # The pipeline models load in the worker processes, their stats are collected by the warm-up
+    return {"api": model_registry.stats(), "pipeline_workers": job_service.model_stats}
+
+@app.get("/health/live")
+def live():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def ready(response: Response):
+    models = {
+        "api": {EMBEDDING_MODEL_KEY: model_registry.is_loaded(EMBEDDING_MODEL_KEY)},
+        "pipeline": job_service.warm_models,
+    }
+    checks = {
+        "elasticsearch": await get_es_client().options(
+            request_timeout=settings.HEALTH_CHECK_TIMEOUT, max_retries=0
+        ).ping(),
+        "mongodb": await run_in_threadpool(db_instance.ping),
+        # A worker died since the last check, the pool is replaced and must warm up again
+        "pipeline_workers": not job_service.restart_broken_pool(),
+        # Without preloading the models are loaded by the first request instead
+        "models": not settings.PRELOAD_MODELS or (
+            all(models["api"].values()) and bool(models["pipeline"]) and all(models["pipeline"].values())
+        ),
+    }
+    ready = all(checks.values())
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "starting",
+        "checks": checks,
+        "models": models,
+        "pipeline_pool_restarts": job_service.pool_restarts,
+    }
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,119 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_resident_memory_mb() -> float:
+    """
+    Get the resident set size of the current process in megabytes.
+
+    Returns:
+        float: Current RSS in MB, the peak RSS where /proc is unavailable and 0 on
+            platforms without either, such as Windows.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        # Unix only
+        import resource
+    except ImportError:
+        return 0.0
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ModelRegistry:
+    """
+    A process-wide registry that loads each model once and reuses it for every call.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """
+        Register a loader for a model. The loader is only called on first use.
+
+        Args:
+            name (str): Key under which the model is stored.
+            loader (Callable): Zero-argument callable returning the loaded model.
+        """
+        self._loaders[name] = loader
+
+    def get(self, name: str) -> Any:
+        """
+        Return the loaded model, loading it on first access.
+
+        Args:
+            name (str): Key of a registered model.
+
+        Returns:
+            Any: The loaded model instance.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            # Another thread may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+            if name not in self._loaders:
+                raise KeyError(f"No loader registered for model '{name}'.")
+
+            logger.info(f"Loading model '{name}'...")
+            rss_before = get_resident_memory_mb()
+            start_time = time.perf_counter()
+            model = self._loaders[name]()
+            load_seconds = time.perf_counter() - start_time
+            rss_after = get_resident_memory_mb()
+
+            self._models[name] = model
+            self._stats[name] = {
+                "load_seconds": round(load_seconds, 3),
+                "rss_delta_mb": round(rss_after - rss_before, 1),
+                "rss_after_mb": round(rss_after, 1),
+            }
+            logger.info(
+                f"Model '{name}' loaded in {load_seconds:.2f}s, "
+                f"resident memory +{rss_after - rss_before:.1f} MB (total {rss_after:.1f} MB)"
+            )
+            return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def preload(self):
+        """
+        Load every registered model, e.g. at application startup.
+        """
+        for name in list(self._loaders):
+            self.get(name)
+
+    def stats(self) -> dict:
+        """
+        Report load time and memory usage of the loaded models.
+
+        Returns:
+            dict: Per-model load statistics, the process ID and its current RSS in MB.
+        """
+        return {
+            "pid": os.getpid(),
+            "models": dict(self._stats),
+            "rss_mb": round(get_resident_memory_mb(), 1),
+        }
+
+
+model_registry = ModelRegistry()
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from controllers import auth_controller, file_controller, workspace_controller
+from controllers import auth_controller, file_controller, workspace_controller, job_controller, search_controller
 
 # Create an APIRouter to register the routes
 router = APIRouter()
@@ -16,4 +16,13 @@ router.get("/workspace/list")(workspace_controller.get_workspaces)
 router.get("/file/list")(file_controller.get_files)
 router.post("/file/upload")(file_controller.process_file)  
 
+# Search Routes
+router.get("/search")(search_controller.search)
+
+# Job Routes
+router.get("/jobs/{job_id}")(job_controller.get_job)
+router.get("/jobs/{job_id}/result")(job_controller.get_job_result)
+router.get("/jobs/{job_id}/events")(job_controller.stream_job)
+router.websocket("/jobs/{job_id}/ws")(job_controller.stream_job_ws)
+
 router.get("auth/logout/")(auth_controller.logout)  
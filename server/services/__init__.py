@@ -1,3 +1,5 @@
 from .auth_service import authservice
 from .elasticsearch_service import elastic_service
-from .fileprocessingservice import file_processing_service
\ No newline at end of file
+from .fileprocessingservice import file_processing_service
+from .job_service import job_service
+from .workspace_resolver import workspace_resolver
@@ -1,15 +1,55 @@
 import uuid
-from config import get_es_client
+import asyncio
+from datetime import datetime, timezone
+from config import get_es_client, settings
+from elasticsearch.helpers import async_bulk
+from services.workspace_resolver import workspace_resolver
 from fastapi import HTTPException
 import logging
+import numpy as np
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def get_chunk_index_name(workspace_name: str) -> str:
+    """
+    Name of the index holding the transcript chunks of a workspace.
+    """
+    return f"{workspace_name}_chunks"
+
+
+def to_index_vector(embedding) -> np.ndarray:
+    """
+    Prepare a chunk embedding for indexing.
+
+    With ES_VECTOR_FLOAT16 the vector is cast to float16 and rounded to four
+    decimals. Casting alone does not shrink the JSON, float16 values are still
+    written with all the digits of their float32 value, the rounding does. The
+    lost precision is below what the int8 quantized index keeps anyway.
+
+    Args:
+        embedding: The embedding as a NumPy array or a list of floats.
+
+    Returns:
+        np.ndarray: A contiguous float32 vector, serialized natively by the client.
+    """
+    vector = np.ascontiguousarray(embedding, dtype=np.float32)
+    if settings.ES_VECTOR_FLOAT16:
+        vector = np.round(vector.astype(np.float16).astype(np.float32), 4)
+    return vector
+
+
 class ElasticsearchService:
     def __init__(self):
-        self.es = get_es_client()
+        self._chunk_indices = set()
+
+    @property
+    def es(self):
+        """
+        The shared async Elasticsearch client.
+        """
+        return get_es_client()
 
     async def create_workspace_index(self, workspace_name: str) -> dict:
         """
@@ -22,22 +62,12 @@ class ElasticsearchService:
             dict: Success or error message
         """
 
-        # Check for workspace with existing name
-        response = self.es.search(
-                index="workspace_mappings",
-                body={
-                "query": {
-                    "term": { "workspace_name.keyword": workspace_name }  
-                }
-            }
-        )
-        
-        # If any hits are found, the workspace already exists
-        if response['hits']['total']['value'] > 0:
+        # Check for workspace with existing name, bypassing the cache
+        if await workspace_resolver.get_workspace_id(workspace_name, use_cache=False):
             return {"error": f"Workspace {workspace_name} already exists."}
 
         index_name = uuid.uuid4().hex
-        response = self.es.indices.create(
+        response = await self.es.indices.create(
             index=index_name,
             settings={
                 "number_of_shards": 1,
@@ -46,21 +76,11 @@ class ElasticsearchService:
             mappings={
                 "properties": {
                     "file_id": {"type": "keyword"},
-                    "transcript": {"type": "text"},
                     "participants": {"type": "keyword"},
                     "filename": {"type": "keyword"},
-                    "transcript_embeddings": {
-                        "type": "nested",
-                        "properties": {
-                            "start": {"type": "float"},
-                            "end": {"type": "float"},
-                            "text": {"type": "text"},
-                            "embedding": {
-                                "type": "dense_vector",
-                                "dims": 768  
-                            }
-                        }
-                    }
+                    "summary": {"type": "text"},
+                    "chunk_count": {"type": "integer"},
+                    "created_at": {"type": "date"}
                 }
             }
         )
@@ -84,8 +104,8 @@ class ElasticsearchService:
             """
             try:
                 # Ensure the 'workspace_mappings' index exists
-                if not self.es.indices.exists(index="workspace_mappings"):
-                    self.es.indices.create(
+                if not await self.es.indices.exists(index="workspace_mappings"):
+                    await self.es.indices.create(
                         index="workspace_mappings",
                         body={
                             "mappings": {
@@ -103,7 +123,8 @@ class ElasticsearchService:
                     "workspace_id": workspace_id
                 }
 
-                self.es.index(index="workspace_mappings", id=workspace_name, body=doc)
+                await self.es.index(index="workspace_mappings", id=workspace_name, body=doc)
+                workspace_resolver.invalidate(workspace_name)
                 return {"message": f"Workspace mapping for {workspace_name} stored successfully with ID {workspace_id}."}
             except Exception as e:
                 return {"error": f"Error storing workspace mapping: {str(e)}"}
@@ -116,50 +137,123 @@ class ElasticsearchService:
                 list: A list of workspace mappings.
             """
             try:
-                # Query to fetch all documents from the workspace_mappings index
-                response = self.es.search(
-                    index="workspace_mappings",
-                    body={"query": {"match_all": {}}}
-                )
-                # Extract the source of each document
-                workspaces = [hit["_source"] for hit in response["hits"]["hits"]]
-                return workspaces
+                # Served from the in-process cache, reloaded in bulk when stale
+                return await workspace_resolver.list_workspaces()
             except ConnectionError:
                 raise HTTPException(status_code=500, detail="Unable to connect to Elasticsearch.")
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Error retrieving workspaces: {str(e)}")     
             
+    async def ensure_chunk_index(self, workspace_name: str, dims: int) -> str:
+        """
+        Create the chunk index of a workspace on first use.
+
+        Transcript chunks are stored as their own documents next to the file
+        documents, with the vector dimension taken from the embeddings produced
+        by the loaded embedding model.
+
+        Args:
+            workspace_name (str): The workspace index name.
+            dims (int): Dimension of the chunk embeddings.
+
+        Returns:
+            str: Name of the chunk index.
+        """
+        chunk_index = get_chunk_index_name(workspace_name)
+        if chunk_index in self._chunk_indices:
+            return chunk_index
+
+        if not await self.es.indices.exists(index=chunk_index):
+            # Another worker may create the same index concurrently
+            await self.es.options(ignore_status=400).indices.create(
+                index=chunk_index,
+                settings={
+                    "number_of_shards": 1,
+                    "number_of_replicas": 0
+                },
+                mappings={
+                    "properties": {
+                        "file_id": {"type": "keyword"},
+                        "chunk_index": {"type": "integer"},
+                        "speaker": {"type": "keyword"},
+                        "start": {"type": "float"},
+                        "end": {"type": "float"},
+                        "text": {"type": "text"},
+                        "embedding": {
+                            "type": "dense_vector",
+                            "dims": dims,
+                            "index": True,
+                            "similarity": "cosine",
+                            "index_options": {"type": settings.ES_VECTOR_INDEX_TYPE}
+                        }
+                    }
+                }
+            )
+            logger.info(f"Created chunk index {chunk_index} with {dims}-dim {settings.ES_VECTOR_INDEX_TYPE} vectors")
+
+        self._chunk_indices.add(chunk_index)
+        return chunk_index
+
     async def store_in_elastic(
             self, workspace_name: str, 
             filename: str, 
-            transcript: str, 
             participants: list, 
-            transcript_embeddings: list
+            transcript_embeddings: list,
+            summary: str = ""
         ) -> str:
+            """
+            Store a processed file: one metadata document plus one document per transcript chunk.
+
+            Args:
+                workspace_name (str): The workspace index name.
+                filename (str): Name of the processed file.
+                participants (list): Meeting participants.
+                transcript_embeddings (list): Chunks with `start`, `end`, `speaker`, `chunk` and `embedding`.
+                summary (str): Summary of the file.
+
+            Returns:
+                str: The generated file ID.
+            """
             
             # Generate a unique file ID
             file_id = uuid.uuid4().hex
 
-            # Build the document structure
+            # The file document only keeps metadata and the summary
             doc = {
                 "file_id": file_id,
-                "transcript": transcript,
                 "participants": participants,
                 "filename": filename,
-                "transcript_embeddings": [
-                    {
-                        "start": segment["start"],
-                        "end": segment["end"],
-                        "text": segment["chunk"],
-                        "embedding": segment["embedding"]
-                    }
-                    for segment in transcript_embeddings
-                ]
+                "summary": summary,
+                "chunk_count": len(transcript_embeddings),
+                "created_at": datetime.now(timezone.utc).isoformat()
             }
 
             try:
+                if transcript_embeddings:
+                    chunk_index = await self.ensure_chunk_index(
+                        workspace_name, len(transcript_embeddings[0]["embedding"])
+                    )
+                    actions = (
+                        {
+                            "_index": chunk_index,
+                            "_id": f"{file_id}-{idx}",
+                            "_source": {
+                                "file_id": file_id,
+                                "chunk_index": idx,
+                                "speaker": segment.get("speaker"),
+                                "start": segment["start"],
+                                "end": segment["end"],
+                                "text": segment["chunk"],
+                                "embedding": to_index_vector(segment["embedding"])
+                            }
+                        }
+                        for idx, segment in enumerate(transcript_embeddings)
+                    )
+                    indexed, _ = await async_bulk(self.es, actions, chunk_size=settings.ES_BULK_CHUNK_SIZE)
+                    logger.info(f"Bulk indexed {indexed} chunks for file_id {file_id}")
+
                 # Index document into Elasticsearch
-                self.es.index(index=workspace_name, id=file_id, body=doc)
+                await self.es.index(index=workspace_name, id=file_id, body=doc)
                 logger.info(f"Successfully indexed document with file_id {file_id}")
                 return file_id
             except Exception as e:
@@ -169,10 +263,101 @@ class ElasticsearchService:
                     detail=f"Error storing data in Elasticsearch: {str(e)}"
                 )
         
-    def retrieve_from_elastic(self, workspace_name: str, file_id: str) -> dict:
+    async def list_files(self, workspace_name: str, size: int = 50, search_after: list = None) -> dict:
+        """
+        Fetch one page of file documents, newest first, with only the listed fields.
+
+        Args:
+            workspace_name (str): The workspace index name.
+            size (int): Page size.
+            search_after (list): `sort` values of the last hit of the previous page.
+
+        Returns:
+            dict: The raw search response with exact total hits.
+        """
+        return await self.es.search(
+            index=workspace_name,
+            query={"match_all": {}},
+            source={"includes": ["filename", "file_id"]},
+            # file_id is unique and breaks ties, so pages never overlap or skip
+            sort=[
+                {"created_at": {"order": "desc", "missing": "_last", "unmapped_type": "date"}},
+                {"file_id": "asc"}
+            ],
+            size=size,
+            search_after=search_after,
+            track_total_hits=True
+        )
+
+    async def hybrid_search(self, workspace_name: str, query: str, query_vector: list, k: int = 10, num_candidates: int = 100) -> list:
+        """
+        Search the transcript chunks of a workspace with kNN and BM25 combined by reciprocal-rank fusion.
+
+        Args:
+            workspace_name (str): The workspace index name.
+            query (str): The user query.
+            query_vector (list): Embedding of the query.
+            k (int): Number of results to return.
+            num_candidates (int): HNSW candidates per shard, higher trades latency for recall.
+
+        Returns:
+            list: Matching chunks with file ID, timestamps, speaker and highlighted text.
+        """
+        chunk_index = get_chunk_index_name(workspace_name)
+        window = max(k, settings.SEARCH_RANK_WINDOW)
+        source = {"excludes": ["embedding"]}
+
+        # Both retrievers run concurrently, the fusion happens here
+        knn_response, bm25_response = await asyncio.gather(
+            self.es.search(
+                index=chunk_index,
+                knn={
+                    "field": "embedding",
+                    "query_vector": query_vector,
+                    "k": min(window, num_candidates),
+                    "num_candidates": num_candidates
+                },
+                source=source,
+                size=window
+            ),
+            self.es.search(
+                index=chunk_index,
+                query={"match": {"text": query}},
+                highlight={"fields": {"text": {}}},
+                source=source,
+                size=window
+            )
+        )
+
+        fused = {}
+        for response in (knn_response, bm25_response):
+            for rank, hit in enumerate(response["hits"]["hits"], start=1):
+                entry = fused.setdefault(hit["_id"], {"score": 0.0, "hit": hit})
+                entry["score"] += 1.0 / (settings.SEARCH_RRF_RANK_CONSTANT + rank)
+                # Prefer the BM25 hit, it carries the highlight
+                if "highlight" in hit:
+                    entry["hit"] = hit
+
+        ranked = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:k]
+        results = []
+        for entry in ranked:
+            chunk = entry["hit"]["_source"]
+            highlight = entry["hit"].get("highlight", {}).get("text")
+            results.append({
+                "file_id": chunk["file_id"],
+                "start": chunk["start"],
+                "end": chunk["end"],
+                "speaker": chunk.get("speaker"),
+                "text": " ... ".join(highlight) if highlight else chunk["text"],
+                "score": round(entry["score"], 6)
+            })
+        return results
+
+    async def retrieve_from_elastic(self, workspace_name: str, file_id: str, fields: list = None) -> dict:
         
         try:
-            response = self.es.get(index=workspace_name, id=file_id)
+            # Restrict _source to the requested fields when given
+            response = await self.es.get(index=workspace_name, id=file_id, source_includes=fields)
             return response["_source"]
         except Exception as e:
             return {"error": f"Error retrieving data from {workspace_name}: {str(e)}"}
@@ -1,11 +1,28 @@
 import os
+import uuid
+import asyncio
+import hashlib
 import logging
-import torch
-from ffmpeg import FFmpeg
-from fastapi import UploadFile
-from utils.diarization_utils import Diarization
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Optional
+from fastapi import UploadFile, HTTPException
+from config import settings
+from models.model_registry import model_registry
+from utils.audio_utils import SAMPLE_RATE, decode_to_pcm_buffer, get_pcm_duration, load_pcm_buffer
+from utils.job_events import JobEventPublisher
+from utils.metrics import record_time
+from utils.diarization_utils import Diarization, DIARIZATION_MODEL_KEY
 from utils.summarization_utils import summarizer
-from utils.whisper_utils import transcribe_audio
+from utils.vad_utils import split_on_silence
+from utils.whisper_utils import WHISPER_MODEL_KEY, stitch_segments
+from utils.stage_workers import (
+    create_diarization_executor,
+    create_transcription_executor,
+    run_diarization,
+    run_transcription,
+    warm_stage_model,
+)
 
 
 logging.basicConfig(level=logging.INFO)
@@ -15,76 +32,242 @@ class FileProcessingService:
     def __init__(self):
         self.diarization = Diarization() 
         self.summarizer = summarizer
-    
-    async def process_audio_video_files(self, file: UploadFile):
+        # Each stage gets its own process so both can use separate cores at the same time
+        self.transcription_executor = create_transcription_executor()
+        self.diarization_executor = create_diarization_executor()
+
+    def warm_up(self) -> dict:
+        """
+        Load every model of the pipeline: the ASR and diarization models in their
+        stage processes and the embedding model in this process.
+
+        Returns:
+            dict: Whether each model is loaded, by registry key, and the model registry
+                stats of this process and of every stage process.
+        """
+        # One call per ASR process, a process busy loading can not take a second one
+        asr_futures = [
+            self.transcription_executor.submit(warm_stage_model, WHISPER_MODEL_KEY)
+            for _ in range(settings.ASR_WORKERS)
+        ]
+        diarization_future = self.diarization_executor.submit(warm_stage_model, DIARIZATION_MODEL_KEY)
+        warm_models = self.summarizer.warm_up()
+        asr_stats = [future.result() for future in asr_futures]
+        diarization_stats = diarization_future.result()
+        warm_models[WHISPER_MODEL_KEY] = all(WHISPER_MODEL_KEY in stats["models"] for stats in asr_stats)
+        warm_models[DIARIZATION_MODEL_KEY] = DIARIZATION_MODEL_KEY in diarization_stats["models"]
+        return {
+            "models": warm_models,
+            "stats": {
+                "worker": model_registry.stats(),
+                "transcription": asr_stats,
+                "diarization": [diarization_stats],
+            }
+        }
+
+    async def run_in_stage_process(self, stage: str, func: Callable, *args):
+        """
+        Run a call in the process pool of a stage, replacing the pool if one of its processes died.
+
+        Args:
+            stage (str): "transcription" or "diarization".
+            func (Callable): Function run in the stage process.
+            *args: Arguments of the function.
 
+        Returns:
+            The result of the call.
+        """
+        executor = self.transcription_executor if stage == "transcription" else self.diarization_executor
         try:
-            file_path = await self.save_file_temporarily(file)
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool as e:
+            self.restart_stage_pool(stage, executor)
+            # Raised as another type so the job service does not take its own pool for broken
+            raise RuntimeError(f"The {stage} process died, e.g. killed out of memory: {e}") from e
+
+    def restart_stage_pool(self, stage: str, broken: Executor):
+        """
+        Replace a broken stage pool, once even when several calls saw it break.
+        """
+        if stage == "transcription" and self.transcription_executor is broken:
+            self.transcription_executor = create_transcription_executor()
+        elif stage == "diarization" and self.diarization_executor is broken:
+            self.diarization_executor = create_diarization_executor()
+        else:
+            return
+        logger.error(f"A {stage} process died, restarting the {stage} pool.")
+        broken.shutdown(wait=False, cancel_futures=True)
 
-            wav_file_path = self.convert_to_wav(file_path)
+    def shutdown(self):
+        """
+        Stop the stage processes.
 
-            logger.info(f"Wav file path {wav_file_path}")
+        They are non-daemon children of this process, which can not exit while they run.
+        """
+        self.transcription_executor.shutdown(wait=True, cancel_futures=True)
+        self.diarization_executor.shutdown(wait=True, cancel_futures=True)
+    
+    async def process_media_file(
+            self, file_path: str,
+            report_stage: Callable[[str, str], None] = None,
+            events: Optional[JobEventPublisher] = None,
+            num_participants: Optional[int] = None
+        ):
+        """
+        Run the transcription, diarization and summarization pipeline on a saved file.
 
-            segments = transcribe_audio(wav_file_path)
-            
-            # Perform Diarization 
-            diarized_segments = await self.diarization.perform_diarization(wav_file_path)
+        Args:
+            file_path (str): Path to the saved audio or video file.
+            report_stage (Callable): Optional callback receiving (stage, status) updates.
+            events (JobEventPublisher): Optional publisher of the partial results: every
+                transcript segment as it is decoded, the speaker turns and the summary.
+            num_participants (int): Number of meeting participants, a speaker count hint for diarization.
+
+        Returns:
+            dict: Summary, transcript, transcript embeddings, audio duration and per-stage timings.
+        """
+        report_stage = report_stage or (lambda stage, status: None)
+        pcm_path = None
+        timings = {}
+
+        try:
+            # Decode once, both stages map the same PCM buffer
+            with record_time(timings, "convert"):
+                pcm_path = decode_to_pcm_buffer(file_path)
+            audio_seconds = get_pcm_duration(pcm_path)
+
+            logger.info(f"PCM buffer path {pcm_path}")
+
+            # Transcription and diarization are independent until mapping, run them concurrently
+            segments, diarized_segments = await asyncio.gather(
+                self.run_stage("transcription", self.transcribe(pcm_path, events), report_stage, timings, "asr"),
+                self.run_stage(
+                    "diarization",
+                    self.run_in_stage_process("diarization", run_diarization, pcm_path, num_participants),
+                    report_stage, timings, "diarization"
+                )
+            )
 
             # Map the transcript segments to diarized segemnts.
-            formatted_transcript = await self.diarization.map_transcription_to_diarization(segments, diarized_segments)
+            report_stage("mapping", "running")
+            with record_time(timings, "mapping"):
+                formatted_transcript = await self.diarization.map_transcription_to_diarization(segments, diarized_segments)
+            report_stage("mapping", "completed")
             logger.info(f"Segments mapped successfully.")
+            if events is not None:
+                events.publish("speakers", {"segments": formatted_transcript})
 
             # Generate LaBSE embeddings for the entire transcript
-            summary_results = self.summarizer.process_and_summarize_transcript(formatted_transcript)
+            report_stage("summarization", "running")
+            summary_results = await self.summarizer.process_and_summarize_transcript(formatted_transcript)
+            report_stage("summarization", "completed")
             logger.info(f"Summary and Transcript Embeddings generated successfully")
 
             logger.info("Summary is %s ", summary_results.get("summary",""))
+            if events is not None:
+                events.publish("summary", {"summary": summary_results.get("summary", "")})
+
+            timings.update(summary_results.pop("timings", {}))
+            summary_results["timings"] = timings
+            summary_results["audio_seconds"] = audio_seconds
             
             return summary_results
         except Exception as e :
             logger.error(f"Error : {e}")
-            raise Exception
+            raise
         finally:
-            os.remove(wav_file_path)
+            if pcm_path and os.path.exists(pcm_path):
+                os.remove(pcm_path)
             os.remove(file_path)
  
-    async def save_file_temporarily(self, file: UploadFile):
-        # Ensure the 'uploads' directory exists
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)  
+    async def transcribe(self, pcm_path: str, events: Optional[JobEventPublisher] = None) -> list:
+        """
+        Transcribe a PCM buffer, in parallel windows cut at silences when several ASR workers are configured.
 
-        # Save the file locally
-        file_path = os.path.join(upload_dir, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        
-        logger.info(f"File saved temporarily: {file_path}")
-        return file_path
-    
-    def convert_to_wav(self, input_file_path: str) -> str:
+        Args:
+            pcm_path (str): Path to the decoded PCM buffer.
+            events (JobEventPublisher): Optional publisher the stage processes send every decoded segment to.
+
+        Returns:
+            list: Whisper segments with timestamps relative to the start of the recording.
         """
-        Convert any audio/video file to .wav format using ffmpeg.
-        
+        if settings.ASR_WORKERS <= 1:
+            return await self.run_in_stage_process("transcription", run_transcription, pcm_path, 0, None, events)
+
+        windows = split_on_silence(load_pcm_buffer(pcm_path))
+        window_segments = await asyncio.gather(*(
+            self.run_in_stage_process("transcription", run_transcription, pcm_path, start, end, events)
+            for start, end in windows
+        ))
+        return stitch_segments(window_segments, [start / SAMPLE_RATE for start, _ in windows])
+
+    async def run_stage(
+            self, stage: str,
+            work: Awaitable,
+            report_stage: Callable[[str, str], None],
+            timings: dict,
+            metric_stage: str
+        ):
+        """
+        Await a pipeline stage and report its progress.
+
         Args:
-            input_file_path (str): Path to the input audio or video file.
+            stage (str): Name of the stage reported to the job.
+            work (Awaitable): The running stage.
+            report_stage (Callable): Callback receiving (stage, status) updates.
+            timings (dict): Stage timings the duration is recorded into.
+            metric_stage (str): Name of the stage in the latency metrics.
 
         Returns:
-            str: Path to the converted .wav file.
+            The result of the stage.
         """
-        wav_file_path = input_file_path.rsplit('.', 1)[0] + '.wav'  # Change extension to .wav
+        report_stage(stage, "running")
+        with record_time(timings, metric_stage):
+            result = await work
+        report_stage(stage, "completed")
+        return result
 
+    async def save_file_temporarily(self, file: UploadFile, max_size: int = settings.MAX_UPLOAD_BYTES) -> dict:
+        """
+        Stream an upload to a unique scratch path in fixed-size chunks.
+
+        Args:
+            file (UploadFile): The uploaded file.
+            max_size (int): Maximum accepted size in bytes, 0 for no limit.
+
+        Returns:
+            dict: The saved file path, its size in bytes and its SHA-256 content hash.
+        """
+        # Ensure the 'uploads' directory exists
+        upload_dir = settings.UPLOAD_DIR
+        os.makedirs(upload_dir, exist_ok=True)  
+
+        # Use a unique name so concurrent uploads of the same file never collide
+        file_extension = os.path.splitext(file.filename)[1].lower()
+        file_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}{file_extension}")
+
+        content_hash = hashlib.sha256()
+        size = 0
         try:
-            ffmpeg = FFmpeg()
-            ffmpeg.input(input_file_path).output(
-                wav_file_path,
-                acodec="pcm_s16le",  
-                ar=16000,            
-                ac=1).execute()
-            
-            logger.info(f"Converted {input_file_path} to {wav_file_path}")
-            return wav_file_path
-        except Exception as e:
-            logger.error(f"Error converting file {input_file_path} to .wav: {str(e)}")
-            raise e
+            with open(file_path, "wb") as f:
+                while chunk := await file.read(settings.UPLOAD_CHUNK_BYTES):
+                    size += len(chunk)
+                    if max_size and size > max_size:
+                        raise HTTPException(
+                            status_code=413,
+                            detail=f"File {file.filename} exceeds the maximum upload size of {max_size} bytes."
+                        )
+                    content_hash.update(chunk)
+                    f.write(chunk)
+        except Exception:
+            os.remove(file_path)
+            raise
         
+        logger.info(f"File saved temporarily: {file_path} ({size} bytes)")
+        return {
+            "file_path": file_path,
+            "size": size,
+            "content_hash": content_hash.hexdigest()
+        }
+    
 file_processing_service = FileProcessingService()
@@ -0,0 +1,470 @@
+import os
+import sys
+import time
+import uuid
+import asyncio
+import logging
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from config import settings
+from services.result_store import result_store
+from utils.job_events import JobEventPublisher, TERMINAL_EVENTS
+from utils.metrics import observe_pipeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_STAGES = ["transcription", "diarization", "mapping", "summarization", "indexing"]
+
+
+def update_job(jobs, job_id: str, **fields):
+    """
+    Update top-level fields of a job record stored in a (possibly shared) dict.
+    """
+    # Manager dict proxies return copies, so the record has to be written back
+    job = jobs[job_id]
+    job.update(fields)
+    job["updated_at"] = time.time()
+    jobs[job_id] = job
+
+
+def update_job_stage(jobs, job_id: str, stage: str, status: str):
+    """
+    Update the status of a single pipeline stage of a job.
+    """
+    job = jobs[job_id]
+    job["stages"][stage] = status
+    job["updated_at"] = time.time()
+    jobs[job_id] = job
+
+
+def run_media_pipeline(
+        jobs, job_id: str, file_path: str, events: JobEventPublisher, num_participants: Optional[int] = None
+    ) -> dict:
+    """
+    Entry point executed inside a pool worker process.
+
+    Args:
+        jobs: Shared job store used to publish per-stage progress.
+        job_id (str): ID of the job being processed.
+        file_path (str): Path of the uploaded file saved by the API process.
+        events (JobEventPublisher): Publisher of the partial results streamed to clients.
+        num_participants (int): Number of meeting participants, a speaker count hint for diarization.
+
+    Returns:
+        dict: The media processing results (summary, transcript and embeddings).
+    """
+    # Imported here so the models are only built inside the worker processes
+    from services.fileprocessingservice import file_processing_service
+
+    update_job(jobs, job_id, status="running")
+
+    def report_stage(stage: str, status: str):
+        update_job_stage(jobs, job_id, stage, status)
+        events.publish("stage", {"stage": stage, "status": status})
+
+    return asyncio.run(file_processing_service.process_media_file(file_path, report_stage, events, num_participants))
+
+
+def shutdown_pipeline_worker():
+    """
+    Stop the stage processes of a pool worker process, if it has started them.
+    """
+    module = sys.modules.get("services.fileprocessingservice")
+    if module is not None:
+        module.file_processing_service.shutdown()
+
+
+def init_pipeline_worker():
+    """
+    Initializer of the pool worker processes.
+
+    A worker exiting waits for its child processes, the stage pools must be shut
+    down first. Finalizers with an exit priority run before that wait, so every
+    worker stops its stage pools when the pool is shut down. The priority is above
+    the one of the multiprocessing queues, which must still feed the stop messages.
+    """
+    Finalize(None, shutdown_pipeline_worker, exitpriority=100)
+
+
+def warm_pipeline_worker() -> dict:
+    """
+    Entry point executed inside a pool worker process to load its models.
+
+    Returns:
+        dict: Whether each pipeline model is loaded, by registry key, and the model
+            registry stats of the worker and its stage processes.
+    """
+    from services.fileprocessingservice import file_processing_service
+
+    return file_processing_service.warm_up()
+
+
+class JobService:
+    """
+    Runs the media processing pipeline in a bounded pool of worker processes
+    and tracks the status of every submitted job.
+    """
+
+    def __init__(self, max_workers: int = settings.PIPELINE_WORKERS, job_ttl: int = settings.JOB_TTL_SECONDS):
+        self.max_workers = max_workers
+        self.job_ttl = job_ttl
+        self.jobs = None
+        self._manager = None
+        self._executor: Optional[Executor] = None
+        self._tasks = set()
+        # Dedupe key -> future of the job currently processing that recording
+        self._inflight = {}
+        # Registry key -> whether every pipeline worker has loaded the model
+        self.warm_models = {}
+        # Model load time and memory of every pipeline worker and its stage processes
+        self.model_stats = []
+        # Number of times the worker pool was replaced after a worker died
+        self.pool_restarts = 0
+        # Events published by the workers, replayed to every new subscriber of a job
+        self._event_queue = None
+        self._event_pump: Optional[threading.Thread] = None
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_log: Dict[str, List[dict]] = {}
+        self._subscribers: Dict[str, set] = {}
+
+    def start(self, executor: Optional[Executor] = None):
+        """
+        Start the shared job store and the worker pool if they are not running yet.
+
+        Args:
+            executor (Executor): Run the pipeline on this executor with an in-process
+                job store instead, e.g. a thread pool in the benchmarks.
+        """
+        if self._executor is not None:
+            return
+        if executor is not None:
+            self.jobs = {}
+            self._event_queue = queue.Queue()
+            self._executor = executor
+            return
+        self._manager = multiprocessing.get_context("spawn").Manager()
+        self.jobs = self._manager.dict()
+        self._event_queue = self._manager.Queue()
+        self._executor = self._create_pool()
+        logger.info(f"Job worker pool started with {self.max_workers} processes.")
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # Forking a process that already holds torch thread pools is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_pipeline_worker
+        )
+
+    def restart_broken_pool(self, warm_up: bool = True) -> bool:
+        """
+        Replace the worker pool if a worker died, e.g. killed out of memory.
+
+        A process pool stays broken once one of its workers died, every later job
+        would fail. The new workers start without models; with PRELOAD_MODELS they
+        are warmed up again in the background.
+
+        Args:
+            warm_up (bool): Warm up the new pool, False when the warm-up itself broke the pool.
+
+        Returns:
+            bool: Whether the pool was broken.
+        """
+        broken = self._executor
+        # Set by ProcessPoolExecutor when a worker died
+        if not isinstance(broken, ProcessPoolExecutor) or not broken._broken:
+            return False
+
+        logger.error(f"A pipeline worker died, restarting the worker pool: {broken._broken}")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_pool()
+        self.pool_restarts += 1
+        self.warm_models = {}
+        self.model_stats = []
+        if warm_up and settings.PRELOAD_MODELS:
+            task = asyncio.create_task(self.warm_up())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(self._log_warm_up_failure)
+        return True
+
+    @staticmethod
+    def _log_warm_up_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Warm-up of the restarted worker pool failed: {task.exception()}")
+
+    async def warm_up(self):
+        """
+        Load the pipeline models in every worker process ahead of the first job.
+
+        One warm-up call is queued per worker; a worker busy loading its models
+        can not take another one, so the calls spread over the pool.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, warm_pipeline_worker)
+                for _ in range(self.max_workers)
+            ))
+        except BrokenProcessPool:
+            # Loading the models killed a worker, retrying would likely kill the next one
+            self.restart_broken_pool(warm_up=False)
+            raise
+        self.warm_models = {
+            key: all(result["models"].get(key, False) for result in results)
+            for key in results[0]["models"]
+        }
+        self.model_stats = [result["stats"] for result in results]
+        logger.info(f"Pipeline workers warmed up: {self.warm_models}")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            if self._event_pump is not None:
+                self._event_queue.put(None)
+                self._event_pump = None
+            if self._manager is not None:
+                self._manager.shutdown()
+            self._executor = None
+            self._manager = None
+            self._event_queue = None
+            self.jobs = None
+
+    def _ensure_event_pump(self):
+        # Events are delivered to the loop of the latest submission
+        self._event_loop = asyncio.get_running_loop()
+        if self._event_pump is None or not self._event_pump.is_alive():
+            self._event_pump = threading.Thread(
+                target=self._pump_events, args=(self._event_queue,), name="job-event-pump", daemon=True
+            )
+            self._event_pump.start()
+
+    def _pump_events(self, event_queue):
+        """
+        Move the events published by the worker processes to the subscribers in this process.
+
+        Runs on its own daemon thread, a blocking read of the queue must not hold a
+        thread of the loop's executor that the loop waits for when it is closed.
+        """
+        while True:
+            try:
+                item = event_queue.get()
+            except Exception as e:
+                logger.warning(f"Job event queue closed: {e}")
+                return
+            if item is None:
+                return
+            job_id, event, data = item
+            try:
+                self._event_loop.call_soon_threadsafe(self._record_event, job_id, {"event": event, "data": data})
+            except RuntimeError:
+                # The loop was closed, e.g. by the end of an asyncio.run
+                logger.warning(f"Dropped '{event}' event of job {job_id}, its event loop is closed.")
+
+    def _record_event(self, job_id: str, event: dict):
+        self._event_log.setdefault(job_id, []).append(event)
+        for subscriber in self._subscribers.get(job_id, ()):
+            subscriber.put_nowait(event)
+
+    def publish(self, job_id: str, event: str, data: dict):
+        """
+        Publish an event from the API process, in order with those of the workers.
+        """
+        JobEventPublisher(self._event_queue, job_id).publish(event, data)
+
+    async def stream_events(self, job_id: str) -> AsyncIterator[dict]:
+        """
+        Yield the events of a job: those published so far, then new ones as they arrive.
+
+        The stream ends with a `completed` or `failed` event.
+
+        Args:
+            job_id (str): ID returned by `create_job`.
+
+        Yields:
+            dict: Events with an `event` type and its `data`.
+        """
+        subscriber = asyncio.Queue()
+        # Subscribing and copying the log happen without yielding to the loop, so no event is lost or repeated
+        self._subscribers.setdefault(job_id, set()).add(subscriber)
+        try:
+            for event in list(self._event_log.get(job_id, [])):
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+            while True:
+                event = await subscriber.get()
+                yield event
+                if event["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            self._subscribers[job_id].discard(subscriber)
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def create_job(
+            self, filename: str, workspace_name: str, content_hash: str = None, num_participants: Optional[int] = None
+        ) -> str:
+        """
+        Register a new queued job.
+
+        Args:
+            filename (str): Name of the uploaded file.
+            workspace_name (str): Workspace the file belongs to.
+            content_hash (str): SHA-256 hash of the uploaded content.
+            num_participants (int): Number of meeting participants, a speaker count hint for diarization.
+
+        Returns:
+            str: The new job ID.
+        """
+        self.start()
+        self.prune_jobs()
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "filename": filename,
+            "workspace_name": workspace_name,
+            "content_hash": content_hash,
+            "num_participants": num_participants,
+            "status": "queued",
+            "stages": {stage: "pending" for stage in JOB_STAGES},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        return job_id
+
+    def submit(self, job_id: str, file_path: str, finalize: Callable[[dict], Awaitable[dict]]):
+        """
+        Schedule the pipeline for a job without waiting for it.
+
+        Args:
+            job_id (str): ID returned by `create_job`.
+            file_path (str): Path of the saved upload.
+            finalize (Callable): Coroutine function run in the API process with the
+                media results; its return value becomes the job result.
+        """
+        self._ensure_event_pump()
+        task = asyncio.create_task(self._run_job(job_id, file_path, finalize))
+        # Keep a reference so the task is not garbage collected while running
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job_id: str, file_path: str, finalize: Callable[[dict], Awaitable[dict]]):
+        try:
+            media_results = await self._get_media_results(job_id, file_path)
+
+            update_job_stage(self.jobs, job_id, "indexing", "running")
+            result = await finalize(media_results)
+            update_job_stage(self.jobs, job_id, "indexing", "completed")
+
+            update_job(self.jobs, job_id, status="completed", result=result)
+            self.publish(job_id, "completed", {"result": result})
+            logger.info(f"Job {job_id} completed.")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            update_job(self.jobs, job_id, status="failed", error=str(e))
+            self.publish(job_id, "failed", {"error": str(e)})
+
+    async def _get_media_results(self, job_id: str, file_path: str) -> dict:
+        """
+        Get the pipeline results of a job, reusing those of an identical recording when possible.
+
+        A recording with the same content hash and pipeline configuration is served
+        from the result store, or shared with a job already processing it.
+        """
+        content_hash = self.jobs[job_id].get("content_hash")
+        num_participants = self.jobs[job_id].get("num_participants")
+        dedupe_key = result_store.make_key(content_hash, num_participants) if content_hash and settings.DEDUPE_UPLOADS else None
+
+        if dedupe_key:
+            try:
+                media_results = await result_store.get(dedupe_key)
+            except Exception as e:
+                # The lookup is an optimization, process the recording when the store is unavailable
+                logger.warning(f"Could not look up stored results for job {job_id}: {e}")
+                media_results = None
+            if media_results is None and dedupe_key in self._inflight:
+                logger.info(f"Job {job_id} waits for an identical recording already being processed.")
+                original = self._inflight[dedupe_key]
+                try:
+                    media_results = await asyncio.shield(original)
+                except (Exception, asyncio.CancelledError) as e:
+                    if not original.done():
+                        # This job itself was cancelled
+                        raise
+                    # The failure may be transient, this job has its own copy of the recording
+                    logger.warning(f"Identical recording failed ({e!r}), job {job_id} processes its own copy.")
+                    media_results = None
+
+            if media_results is not None:
+                os.remove(file_path)
+                for stage in JOB_STAGES[:-1]:
+                    update_job_stage(self.jobs, job_id, stage, "cached")
+                self.publish(job_id, "speakers", {"segments": media_results.get("segments", [])})
+                self.publish(job_id, "summary", {"summary": media_results.get("summary", "")})
+                return media_results
+
+        loop = asyncio.get_running_loop()
+        inflight = loop.create_future() if dedupe_key else None
+        if inflight is not None:
+            self._inflight[dedupe_key] = inflight
+
+        try:
+            media_results = await loop.run_in_executor(
+                self._executor, run_media_pipeline, self.jobs, job_id, file_path,
+                JobEventPublisher(self._event_queue, job_id), num_participants
+            )
+            observe_pipeline(media_results.pop("timings", {}), media_results.get("audio_seconds"))
+            if inflight is not None:
+                inflight.set_result(media_results)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self.restart_broken_pool()
+            if inflight is not None:
+                inflight.set_exception(e)
+                # Mark the exception as retrieved when no duplicate was waiting
+                inflight.exception()
+            raise
+        finally:
+            if inflight is not None:
+                self._inflight.pop(dedupe_key, None)
+                # Never leave waiting duplicates hanging, e.g. on cancellation
+                if not inflight.done():
+                    inflight.cancel()
+
+        if inflight is not None:
+            try:
+                await result_store.put(dedupe_key, media_results)
+            except Exception as e:
+                logger.warning(f"Could not store results of job {job_id} for reuse: {e}")
+        return media_results
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        if self.jobs is None:
+            return None
+        return self.jobs.get(job_id)
+
+    def prune_jobs(self):
+        """
+        Drop finished jobs older than the configured TTL.
+        """
+        cutoff = time.time() - self.job_ttl
+        for job_id, job in list(self.jobs.items()):
+            if job["status"] in ("completed", "failed") and job["updated_at"] < cutoff:
+                del self.jobs[job_id]
+                self._event_log.pop(job_id, None)
+
+
+job_service = JobService()
@@ -0,0 +1,114 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from elasticsearch import NotFoundError
+
+from config import get_es_client, settings
+from utils.diarization_utils import get_speaker_hint
+from utils.helper import hash_string
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROCESSED_MEDIA_INDEX = "processed_media"
+
+# Bump when a pipeline change alters its output for the same input and configuration
+PIPELINE_VERSION = 2
+
+
+def get_pipeline_fingerprint(num_participants: Optional[int] = None) -> str:
+    """
+    Hash of everything besides the audio that determines the pipeline output.
+    """
+    config = {
+        "version": PIPELINE_VERSION,
+        "whisper": settings.WHISPER_MODEL_NAME,
+        "asr_backend": settings.ASR_BACKEND,
+        "asr_compute_type": settings.ASR_COMPUTE_TYPE if settings.ASR_BACKEND == "faster-whisper" else None,
+        "asr_stream_window": settings.ASR_STREAM_WINDOW_SECONDS if settings.ASR_BACKEND == "openai-whisper" else None,
+        # Transcribing in windows cut at silences changes the transcript of long recordings
+        "asr_windows": {
+            "min_seconds": settings.ASR_MIN_WINDOW_SECONDS,
+            "max_seconds": settings.ASR_MAX_WINDOW_SECONDS,
+            "vad_frame_ms": settings.VAD_FRAME_MS,
+            "vad_threshold_db": settings.VAD_THRESHOLD_DB,
+            "vad_min_silence_seconds": settings.VAD_MIN_SILENCE_SECONDS,
+        } if settings.ASR_WORKERS > 1 else None,
+        "diarization": settings.DIARIZATION_MODEL_NAME,
+        "speaker_hint": get_speaker_hint(num_participants),
+        "embedding": settings.EMBEDDING_MODEL,
+        "llm": settings.GROQ_LLM_NAME,
+        "summary_threshold": settings.SUMMARY_MAP_REDUCE_THRESHOLD,
+        "summary_chunk_tokens": settings.SUMMARY_CHUNK_TOKENS,
+    }
+    return hash_string(json.dumps(config, sort_keys=True))
+
+
+class ResultStore:
+    """
+    Content-addressed store of completed pipeline results, keyed by the
+    upload's content hash and the pipeline configuration.
+    """
+
+    def __init__(self):
+        self._index_ready = False
+
+    @staticmethod
+    def make_key(content_hash: str, num_participants: Optional[int] = None) -> str:
+        return f"{content_hash}-{get_pipeline_fingerprint(num_participants)}"
+
+    async def get(self, key: str) -> Optional[dict]:
+        """
+        Look up the results of a previously processed recording.
+
+        Args:
+            key (str): Key built with `make_key`.
+
+        Returns:
+            Optional[dict]: Summary, transcript, segments and embeddings, or None on a miss.
+        """
+        try:
+            response = await get_es_client().get(index=PROCESSED_MEDIA_INDEX, id=key)
+        except NotFoundError:
+            return None
+        logger.info(f"Reusing processed results for {key}")
+        return response["_source"]["result"]
+
+    async def put(self, key: str, media_results: dict):
+        """
+        Store the results of a completed pipeline run.
+
+        Args:
+            key (str): Key built with `make_key`.
+            media_results (dict): Summary, transcript, segments and embeddings.
+        """
+        if not self._index_ready:
+            # Results are only fetched by ID, so nothing inside them is indexed
+            await get_es_client().options(ignore_status=400).indices.create(
+                index=PROCESSED_MEDIA_INDEX,
+                settings={"number_of_shards": 1, "number_of_replicas": 0},
+                mappings={
+                    "dynamic": False,
+                    "properties": {
+                        "created_at": {"type": "date"},
+                        "result": {"type": "object", "enabled": False}
+                    }
+                }
+            )
+            self._index_ready = True
+
+        doc = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "result": {
+                "summary": media_results.get("summary", ""),
+                "transcript": media_results.get("transcript", ""),
+                "segments": media_results.get("segments", []),
+                "embeddings": media_results.get("embeddings", [])
+            }
+        }
+        await get_es_client().index(index=PROCESSED_MEDIA_INDEX, id=key, document=doc)
+
+
+result_store = ResultStore()
@@ -0,0 +1,115 @@
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+from elasticsearch import NotFoundError
+
+from config import get_es_client, settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORKSPACE_MAPPINGS_INDEX = "workspace_mappings"
+
+
+class WorkspaceResolver:
+    """
+    In-process cache of workspace name to index ID mappings with a TTL.
+
+    The mapping document ID is the workspace name, so cache misses are
+    served by a direct `get` instead of a search.
+    """
+
+    def __init__(self, ttl: int = settings.WORKSPACE_CACHE_TTL):
+        self.ttl = ttl
+        # workspace name -> (workspace ID or None if it does not exist, expiry time)
+        self._entries: Dict[str, Tuple[Optional[str], float]] = {}
+        self._loaded_at = 0.0
+
+    async def load_all(self):
+        """
+        Load every workspace mapping in bulk, e.g. at startup.
+        """
+        try:
+            response = await get_es_client().search(
+                index=WORKSPACE_MAPPINGS_INDEX,
+                query={"match_all": {}},
+                size=10000
+            )
+        except NotFoundError:
+            # No workspace has been created yet
+            response = {"hits": {"hits": []}}
+
+        expires_at = time.monotonic() + self.ttl
+        self._entries = {
+            hit["_source"]["workspace_name"]: (hit["_source"]["workspace_id"], expires_at)
+            for hit in response["hits"]["hits"]
+        }
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(self._entries)} workspace mappings.")
+
+    async def list_workspaces(self) -> list:
+        """
+        List all workspaces, reloading the mappings once the TTL has expired.
+
+        Returns:
+            list: Workspace mappings with `workspace_name` and `workspace_id`.
+        """
+        if time.monotonic() - self._loaded_at > self.ttl:
+            await self.load_all()
+        return [
+            {"workspace_name": name, "workspace_id": workspace_id}
+            for name, (workspace_id, _) in self._entries.items()
+            if workspace_id is not None
+        ]
+
+    async def get_workspace_id(self, workspace_name: str, use_cache: bool = True) -> Optional[str]:
+        """
+        Get the index ID of a workspace.
+
+        Args:
+            workspace_name (str): The user-provided workspace name.
+            use_cache (bool): Set to False to always read the mapping from Elasticsearch.
+
+        Returns:
+            Optional[str]: The workspace index ID, or None if the workspace does not exist.
+        """
+        entry = self._entries.get(workspace_name)
+        if use_cache and entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        try:
+            response = await get_es_client().get(index=WORKSPACE_MAPPINGS_INDEX, id=workspace_name)
+            workspace_id = response["_source"]["workspace_id"]
+        except NotFoundError:
+            workspace_id = None
+
+        # Unknown names are cached too, so repeated lookups stay in process
+        self._entries[workspace_name] = (workspace_id, time.monotonic() + self.ttl)
+        return workspace_id
+
+    async def resolve_index(self, workspace: str) -> str:
+        """
+        Resolve a workspace name to its index, passing index IDs through unchanged.
+
+        Args:
+            workspace (str): A workspace name or an index ID.
+
+        Returns:
+            str: The index name to query.
+        """
+        workspace_id = await self.get_workspace_id(workspace)
+        return workspace_id or workspace
+
+    def invalidate(self, workspace_name: Optional[str] = None):
+        """
+        Drop a cached mapping, or all of them, and force the workspace list to reload.
+        """
+        if workspace_name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(workspace_name, None)
+        self._loaded_at = 0.0
+
+
+workspace_resolver = WorkspaceResolver()
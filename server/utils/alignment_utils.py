@@ -0,0 +1,83 @@
+from typing import List, Dict
+
+
+def align_segments(transcription: List[Dict], diarization: List[Dict], tolerance: float = 0.5) -> List[Dict]:
+    """
+    Attribute transcription segments to speakers with a single sweep over both timelines.
+
+    Both inputs are walked in order of start time while a small set of active
+    diarization segments is maintained, so the cost is O(n + m) for the bounded
+    speaker overlap of real meetings instead of checking every pair.
+
+    A diarization segment is a candidate for a transcription segment when the gap
+    between them is below `tolerance`. Candidates with a real overlap produce one
+    entry each; a transcription segment without any candidate is kept as "UNKNOWN".
+
+    Args:
+        transcription (List[Dict]): Transcription segments with `start`, `end`, and `text`.
+        diarization (List[Dict]): Diarization segments with `start`, `end`, and `speaker`.
+        tolerance (float): Time tolerance in seconds for aligning transcription and diarization.
+
+    Returns:
+        List[Dict]: Unified transcript with adjacent segments of the same speaker merged.
+    """
+    dia_order = sorted(range(len(diarization)), key=lambda i: diarization[i]['start'])
+    trans_order = sorted(range(len(transcription)), key=lambda i: transcription[i]['start'])
+
+    # Entries produced for each transcription segment, kept by input position
+    entries_by_trans = [None] * len(transcription)
+    active = []
+    next_dia = 0
+
+    for trans_idx in trans_order:
+        trans = transcription[trans_idx]
+        trans_start = trans['start']
+        trans_end = trans['end']
+
+        # Activate every diarization segment starting before the end of this window
+        while next_dia < len(dia_order) and diarization[dia_order[next_dia]]['start'] < trans_end + tolerance:
+            active.append(dia_order[next_dia])
+            next_dia += 1
+
+        # Segments ending this far back can not reach any later transcription segment
+        active = [i for i in active if diarization[i]['end'] > trans_start - tolerance]
+
+        candidates = sorted(i for i in active if diarization[i]['start'] < trans_end + tolerance)
+
+        if not candidates:
+            # No matching diarization, assign as "UNKNOWN"
+            entries_by_trans[trans_idx] = [{
+                "start": trans_start,
+                "end": trans_end,
+                "speaker": "UNKNOWN",
+                "text": trans['text']
+            }]
+            continue
+
+        entries = []
+        for dia_idx in candidates:
+            dia = diarization[dia_idx]
+            overlap_start = max(dia['start'], trans_start)
+            overlap_end = min(dia['end'], trans_end)
+
+            if overlap_start < overlap_end:
+                entries.append({
+                    "start": overlap_start,
+                    "end": overlap_end,
+                    "speaker": dia['speaker'],
+                    "text": trans['text']
+                })
+        entries_by_trans[trans_idx] = entries
+
+    # Merge adjacent segments with the same speaker
+    merged_transcript = []
+    for entries in entries_by_trans:
+        for seg in entries:
+            if merged_transcript and seg['speaker'] == merged_transcript[-1]['speaker']:
+                # Extend the previous segment
+                merged_transcript[-1]['end'] = seg['end']
+                merged_transcript[-1]['text'] += " " + seg['text']
+            else:
+                merged_transcript.append(seg)
+
+    return merged_transcript
@@ -0,0 +1,189 @@
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Type
+
+import numpy as np
+
+from config.settings import settings
+from utils.audio_utils import SAMPLE_RATE
+from utils.vad_utils import split_on_silence
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def get_asr_process_threads() -> int:
+    """
+    Thread budget of one ASR process, the ASR budget is shared by the ASR_WORKERS processes.
+    """
+    return max(1, settings.ASR_TORCH_THREADS // settings.ASR_WORKERS)
+
+
+class ASRBackend:
+    """
+    Interface of a speech recognition engine.
+
+    Every backend returns Whisper-style segments, dicts with at least `start`,
+    `end` and `text`, so the rest of the pipeline does not depend on the engine.
+    """
+
+    name = "base"
+
+    def __init__(self, model_name: str = settings.WHISPER_MODEL_NAME):
+        self.model_name = model_name
+        self.model = None
+        self.last_real_time_factor = None
+
+    def load(self) -> "ASRBackend":
+        """
+        Load the model, called once per process through the model registry.
+        """
+        raise NotImplementedError
+
+    def _transcribe(self, audio: np.ndarray, on_segment: Callable[[Dict], None]) -> List[Dict]:
+        raise NotImplementedError
+
+    def transcribe(self, audio: np.ndarray, on_segment: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Transcribe 16 kHz float32 samples and record the real-time factor.
+
+        Args:
+            audio (np.ndarray): Mono 16 kHz float32 samples.
+            on_segment (Callable): Called with every segment as soon as the backend has decoded it.
+
+        Returns:
+            List[Dict]: Segments with `start`, `end` and `text`.
+        """
+        start_time = time.perf_counter()
+        segments = self._transcribe(audio, on_segment or (lambda segment: None))
+        elapsed = time.perf_counter() - start_time
+
+        audio_seconds = len(audio) / SAMPLE_RATE
+        self.last_real_time_factor = elapsed / audio_seconds if audio_seconds else None
+        logger.info(
+            f"{self.name} ({self.model_name}) transcribed {audio_seconds:.1f}s of audio in {elapsed:.1f}s"
+            + (f", real-time factor {self.last_real_time_factor:.3f}" if self.last_real_time_factor else "")
+        )
+        return segments
+
+
+class OpenAIWhisperBackend(ASRBackend):
+    """
+    The reference openai-whisper implementation on PyTorch.
+    """
+
+    name = "openai-whisper"
+
+    def load(self) -> "OpenAIWhisperBackend":
+        import whisper
+
+        self.model = whisper.load_model(self.model_name)
+        return self
+
+    def __init__(
+            self,
+            model_name: str = settings.WHISPER_MODEL_NAME,
+            stream_window_seconds: float = settings.ASR_STREAM_WINDOW_SECONDS
+        ):
+        super().__init__(model_name)
+        self.stream_window_seconds = stream_window_seconds
+
+    def _transcribe(self, audio: np.ndarray, on_segment: Callable[[Dict], None]) -> List[Dict]:
+        # Imported here, whisper_utils imports this module
+        from utils.whisper_utils import stitch_segments
+
+        if self.stream_window_seconds > 0:
+            windows = split_on_silence(audio, self.stream_window_seconds / 2, self.stream_window_seconds)
+        else:
+            windows = [(0, len(audio))]
+
+        # openai-whisper only returns the segments once its whole input is decoded, so it
+        # decodes one window at a time, about as long as its own 30 second seek windows
+        segments, previous_text = [], None
+        for start, end in windows:
+            result = self.model.transcribe(audio[start:end], verbose=True, initial_prompt=previous_text)
+            # Condition every window on the text of the previous one, as whisper does between seek windows
+            previous_text = result["text"] or None
+            for segment in stitch_segments([result["segments"]], [start / SAMPLE_RATE]):
+                segment["id"] = len(segments)
+                on_segment(segment)
+                segments.append(segment)
+        return segments
+
+
+class FasterWhisperBackend(ASRBackend):
+    """
+    faster-whisper, the Whisper models running on CTranslate2.
+
+    With int8 weights it needs a fraction of the memory of openai-whisper and
+    runs several times faster on CPU for the same model size.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(
+            self,
+            model_name: str = settings.WHISPER_MODEL_NAME,
+            device: str = settings.ASR_DEVICE,
+            compute_type: str = settings.ASR_COMPUTE_TYPE,
+            beam_size: int = settings.ASR_BEAM_SIZE,
+            cpu_threads: Optional[int] = None
+        ):
+        super().__init__(model_name)
+        self.device = device
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.cpu_threads = cpu_threads or get_asr_process_threads()
+
+    def load(self) -> "FasterWhisperBackend":
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(
+            self.model_name,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads
+        )
+        return self
+
+    def _transcribe(self, audio: np.ndarray, on_segment: Callable[[Dict], None]) -> List[Dict]:
+        segments, _ = self.model.transcribe(np.asarray(audio, dtype=np.float32), beam_size=self.beam_size)
+        # The segments are decoded lazily while iterating
+        results = []
+        for segment in segments:
+            result = {
+                "id": segment.id,
+                "seek": segment.seek,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": list(segment.tokens),
+                "temperature": segment.temperature,
+                "avg_logprob": segment.avg_logprob,
+                "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            on_segment(result)
+            results.append(result)
+        return results
+
+
+ASR_BACKENDS: Dict[str, Type[ASRBackend]] = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_asr_backend(name: str = settings.ASR_BACKEND) -> ASRBackend:
+    """
+    Create the ASR backend selected by name.
+
+    Args:
+        name (str): One of ASR_BACKENDS.
+
+    Returns:
+        ASRBackend: The backend, not loaded yet.
+    """
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend '{name}', expected one of {list(ASR_BACKENDS)}.")
+    return ASR_BACKENDS[name]()
@@ -0,0 +1,71 @@
+import os
+import uuid
+import logging
+
+import numpy as np
+from ffmpeg import FFmpeg
+
+from config.settings import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+def decode_to_pcm_buffer(input_file_path: str, buffer_dir: str = settings.PCM_BUFFER_DIR) -> str:
+    """
+    Decode an audio/video file once into raw mono 16 kHz float32 PCM.
+
+    ffmpeg writes the samples straight into a scratch file which every stage maps
+    into memory, so neither Whisper nor pyannote has to decode the file again.
+
+    Args:
+        input_file_path (str): Path to the input audio or video file.
+        buffer_dir (str): Directory of the PCM buffer, tmpfs (/dev/shm) keeps it in RAM.
+
+    Returns:
+        str: Path to the PCM buffer.
+    """
+    os.makedirs(buffer_dir, exist_ok=True)
+    pcm_path = os.path.join(buffer_dir, f"{uuid.uuid4().hex}.f32")
+
+    try:
+        FFmpeg().option("y").input(input_file_path).output(
+            pcm_path,
+            f="f32le",
+            acodec="pcm_f32le",
+            ar=SAMPLE_RATE,
+            ac=1).execute()
+    except Exception as e:
+        logger.error(f"Error decoding file {input_file_path} to PCM: {str(e)}")
+        if os.path.exists(pcm_path):
+            os.remove(pcm_path)
+        raise e
+
+    logger.info(f"Decoded {input_file_path} to {pcm_path} ({get_pcm_duration(pcm_path):.1f}s of audio)")
+    return pcm_path
+
+
+def load_pcm_buffer(pcm_path: str) -> np.ndarray:
+    """
+    Map a PCM buffer into memory without copying it.
+
+    Args:
+        pcm_path (str): Path returned by `decode_to_pcm_buffer`.
+
+    Returns:
+        np.ndarray: 1-D float32 array of samples at 16 kHz.
+    """
+    if os.path.getsize(pcm_path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    # Copy-on-write keeps the array writable for torch.from_numpy while
+    # guaranteeing that one stage can never modify the samples of another
+    return np.memmap(pcm_path, dtype=np.float32, mode="c")
+
+
+def get_pcm_duration(pcm_path: str) -> float:
+    """
+    Get the duration of a PCM buffer in seconds.
+    """
+    return os.path.getsize(pcm_path) / (np.dtype(np.float32).itemsize * SAMPLE_RATE)
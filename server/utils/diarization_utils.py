@@ -1,7 +1,9 @@
-from pyannote.audio import Pipeline
 from config.settings import settings
-from typing import List, Dict
-import torch
+from models.model_registry import model_registry
+from utils.alignment_utils import align_segments
+from utils.audio_utils import SAMPLE_RATE
+from typing import List, Dict, Optional, Union
+import numpy as np
 import logging
 
 # Configure the logger
@@ -11,29 +13,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DIARIZATION_MODEL_KEY = "diarization"
+
+
+def load_diarization_pipeline():
+    """
+    Load the pretrained pyannote speaker diarization pipeline.
+    """
+    from pyannote.audio import Pipeline
+
+    pipeline = Pipeline.from_pretrained(
+        settings.DIARIZATION_MODEL_NAME,
+        use_auth_token= settings.HUGGING_FACE_ACCESS_TOKEN
+    )
+    # Larger batches amortize the per-call overhead of the segmentation and embedding models
+    if hasattr(pipeline, "segmentation_batch_size"):
+        pipeline.segmentation_batch_size = settings.DIARIZATION_SEGMENTATION_BATCH_SIZE
+    if hasattr(pipeline, "embedding_batch_size"):
+        pipeline.embedding_batch_size = settings.DIARIZATION_EMBEDDING_BATCH_SIZE
+    return pipeline
+
+
+def get_speaker_hint(num_participants: Optional[int]) -> Dict[str, int]:
+    """
+    Turn the number of meeting participants into speaker count arguments of the pipeline.
+
+    A known speaker count spares pyannote the open-ended search over the number
+    of clusters, which is faster and avoids merging or splitting speakers on long calls.
+
+    Args:
+        num_participants (int): Number of participants of the meeting, None when unknown.
+
+    Returns:
+        Dict[str, int]: `num_speakers`, or `min_speakers` and `max_speakers`, empty without a hint.
+    """
+    if not num_participants or settings.DIARIZATION_SPEAKER_HINT == "none":
+        return {}
+    if settings.DIARIZATION_SPEAKER_HINT == "exact":
+        return {"num_speakers": num_participants}
+    if settings.DIARIZATION_SPEAKER_HINT == "range":
+        return {
+            "min_speakers": max(1, num_participants - settings.DIARIZATION_SPEAKER_MARGIN),
+            "max_speakers": num_participants + settings.DIARIZATION_SPEAKER_MARGIN
+        }
+    raise ValueError(
+        f"Unknown DIARIZATION_SPEAKER_HINT '{settings.DIARIZATION_SPEAKER_HINT}', expected exact, range or none."
+    )
+
+
+model_registry.register(DIARIZATION_MODEL_KEY, load_diarization_pipeline)
+
+
 class Diarization:
-    def __init__(self):
+    @property
+    def pipeline(self):
         """
-        Initialize the diarization tool.
-
-        Args:
-            diarization_model (str): Pretrained model for speaker diarization.
+        The diarization pipeline, loaded once per process through the model registry.
         """
-        self.pipeline = Pipeline.from_pretrained(
-            settings.DIARIZATION_MODEL_NAME,
-            use_auth_token= settings.HUGGING_FACE_ACCESS_TOKEN
-        )
-    async def perform_diarization(self, audio_file_path: str):
+        return model_registry.get(DIARIZATION_MODEL_KEY)
+
+    async def perform_diarization(self, audio: Union[str, np.ndarray], num_participants: Optional[int] = None):
         """
-        Send audio file to huggingface api for diarization
+        Run the pyannote diarization pipeline on an audio file or decoded samples.
 
         Args:
-            audio_file_path (str): Path to the audio file.
+            audio (Union[str, np.ndarray]): Path to the audio file or 16 kHz float32 samples.
+            num_participants (int): Number of meeting participants, used to bound the speaker count.
 
         Returns:
-            dict: Diarization response from the API.
+            list: Speaker segments with `start`, `end` and `speaker`.
         """
-        logger.info(f"Performing diarization on file: {audio_file_path}")
+        if isinstance(audio, np.ndarray):
+            import torch
+
+            logger.info(f"Performing diarization on {len(audio) / SAMPLE_RATE:.1f}s of audio")
+            # Wrap the samples as a (channel, time) tensor without copying them
+            audio = {"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": SAMPLE_RATE}
+        else:
+            logger.info(f"Performing diarization on file: {audio}")
         # run the pipeline on an audio file
         if self.pipeline:
             logger.info("Initialization successfully")
@@ -42,7 +99,10 @@ class Diarization:
 
         # self.pipeline.to(torch.device("cuda"))
 
-        diarization = self.pipeline(audio_file_path)
+        speaker_hint = get_speaker_hint(num_participants)
+        if speaker_hint:
+            logger.info(f"Diarizing with speaker count hint {speaker_hint}")
+        diarization = self.pipeline(audio, **speaker_hint)
 
         logger.info(f"Diarized content: {diarization} ")
         speaker_segments = []
@@ -68,65 +128,11 @@ class Diarization:
         Returns:
             List[Dict]: Unified transcript with speaker attribution and text.
         """
-        # Resultant unified transcript
-        unified_transcript = []
-        logger.info("Mapping begins.")
-    
-        logger.info(f"Diarization object type: {type(diarization)}")
-        logger.info(f"Diarization object content: {diarization}")
-        logger.info(f"Transcription object type: {type(transcription)}")
-        logger.info(f"Transcription object content: {transcription}")
-
-        # Process transcription segments
-        for trans in transcription:
-            logger.info(f"Transcription accessed: {trans} of the type: {type(trans)}")
-            trans_start = trans.get('start')
-            logger.info("Accessed.")
-            trans_end = trans['end']
-            trans_text = trans['text']
-            
-            logger.info("Overlaping begins.")
-            # Collect all diarization segments overlapping with this transcription
-            overlapping_segments = [
-                dia for dia in diarization
-                if max(dia['start'], trans_start) - min(dia['end'], trans_end) < tolerance
-            ]
-            logger.info("Overlaping over.")
-            # Handle edge cases: no overlap or multiple overlaps
-            if not overlapping_segments:
-                # No matching diarization, assign as "UNKNOWN"
-                unified_transcript.append({
-                    "start": trans_start,
-                    "end": trans_end,
-                    "speaker": "UNKNOWN",
-                    "text": trans_text
-                })
-            else:
-                # Map text to overlapping diarization segments
-                for dia in overlapping_segments:
-                    overlap_start = max(dia['start'], trans_start)
-                    overlap_end = min(dia['end'], trans_end)
-                    
-                    if overlap_start < overlap_end:
-                        # Split transcription text proportionally if needed
-                        unified_transcript.append({
-                            "start": overlap_start,
-                            "end": overlap_end,
-                            "speaker": dia['speaker'],
-                            "text": trans_text  # Adjust splitting logic for detailed mapping
-                        })
-        
-        # Merge adjacent segments with the same speaker
-        merged_transcript = []
-        for seg in unified_transcript:
-            if merged_transcript and seg['speaker'] == merged_transcript[-1]['speaker']:
-                # Extend the previous segment
-                merged_transcript[-1]['end'] = seg['end']
-                merged_transcript[-1]['text'] += " " + seg['text']
-            else:
-                # Add a new segment
-                merged_transcript.append(seg)
-        
+        logger.info(f"Mapping {len(transcription)} transcription segments to {len(diarization)} diarization segments.")
+        merged_transcript = align_segments(transcription, diarization, tolerance)
+        logger.debug(f"Mapped transcript: {merged_transcript}")
+        logger.info(f"Mapping completed. {len(merged_transcript)} speaker turns found.")
+
         return merged_transcript
     
     def format_combined_segments(self, combined_segments):
@@ -6,6 +6,7 @@ import json
 from fastapi import HTTPException
 from datetime import datetime
 import hashlib
+import base64
 
 logger = logging.getLogger(__name__)
 
@@ -73,3 +74,36 @@ def hash_string(input_string: str):
         str: SHA256 hash of the input string.
     """
     return hashlib.sha256(input_string.encode()).hexdigest()
+
+def encode_cursor(sort_values: list) -> str:
+    """
+    Helper function to turn Elasticsearch `sort` values into an opaque pagination cursor.
+
+    Args:
+        sort_values (list): The `sort` values of the last hit of a page.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    return base64.urlsafe_b64encode(json.dumps(sort_values).encode()).decode()
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Helper function to turn a pagination cursor back into `search_after` values.
+
+    Args:
+        cursor (str): Cursor created by `encode_cursor`.
+
+    Returns:
+        list: The `search_after` values.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        sort_values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(sort_values, list):
+        raise ValueError("Invalid cursor.")
+    return sort_values
@@ -0,0 +1,32 @@
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Events ending the stream of a job
+TERMINAL_EVENTS = ("completed", "failed")
+
+
+class JobEventPublisher:
+    """
+    Publishes the progress events of one job to the queue drained by the API process.
+
+    The publisher is picklable, so it can be handed to the pipeline worker and
+    from there to the stage processes, which publish partial results directly.
+    """
+
+    def __init__(self, queue, job_id: str):
+        """
+        Args:
+            queue: A multiprocessing manager queue, or a `queue.Queue` for in-process jobs.
+            job_id (str): ID of the job the events belong to.
+        """
+        self.queue = queue
+        self.job_id = job_id
+
+    def publish(self, event: str, data: dict):
+        try:
+            self.queue.put((self.job_id, event, data))
+        except Exception as e:
+            # Streaming is best effort, it must never fail the job
+            logger.warning(f"Could not publish '{event}' event of job {self.job_id}: {e}")
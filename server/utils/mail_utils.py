@@ -1,25 +1,131 @@
 from config.settings import settings
 from ssl import create_default_context
-from services.elasticsearch_service import ElasticsearchService
 from email.mime.text import MIMEText
-from smtplib import SMTP
+from typing import List, Optional
+from aiosmtplib import SMTP, SMTPServerDisconnected
 
+import asyncio
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def send_email(workspace_name: str, file_id: str, summary: str, elastic_service: ElasticsearchService):
+
+class MailSender:
+    """
+    Sends mails over a small pool of persistent, authenticated SMTP sessions.
+    """
+
+    def __init__(self, pool_size: int = settings.MAIL_POOL_SIZE, batch_size: int = settings.MAIL_BATCH_SIZE):
+        """
+        Initialize the mail sender.
+
+        Args:
+            pool_size (int): Maximum number of open SMTP sessions.
+            batch_size (int): Maximum number of recipients per message.
+        """
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self._idle: Optional[asyncio.Queue] = None
+        # One slot per session in use, released when the session is returned or dropped
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _connect(self) -> SMTP:
+        logger.info("Attempting to connect to SMTP server...")
+        client = SMTP(
+            hostname=settings.HOST,
+            port=int(settings.PORT),
+            start_tls=True,
+            tls_context=create_default_context()
+        )
+        await client.connect()
+        await client.login(settings.USERNAME, settings.PASSWORD)
+        logger.info("Connected to SMTP server")
+        return client
+
+    async def _acquire(self) -> SMTP:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.pool_size)
+
+        await self._slots.acquire()
+        try:
+            client = None if self._idle.empty() else self._idle.get_nowait()
+            # The server may have dropped an idle session
+            if client is None or not client.is_connected:
+                client = await self._connect()
+            return client
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, client: SMTP):
+        self._idle.put_nowait(client)
+        self._slots.release()
+
+    def _drop(self, client: SMTP):
+        if client.is_connected:
+            client.close()
+        self._slots.release()
+
+    async def send(self, recipients: List[str], subject: str, html: str):
+        """
+        Send the same HTML message to many recipients, batching them into as few messages as possible.
+
+        Args:
+            recipients (List[str]): Recipient addresses.
+            subject (str): Mail subject.
+            html (str): HTML body.
+        """
+        client = await self._acquire()
+        try:
+            for start in range(0, len(recipients), self.batch_size):
+                batch = recipients[start:start + self.batch_size]
+                message = MIMEText(html, "html")
+                message["Subject"] = subject
+                message["From"] = settings.USERNAME
+                message["To"] = ", ".join(batch)
+
+                try:
+                    await client.send_message(message, recipients=batch)
+                except SMTPServerDisconnected:
+                    # Reconnect once if the session expired between checks
+                    client = await self._connect()
+                    await client.send_message(message, recipients=batch)
+                logger.info(f"Mail sent successfully to {len(batch)} recipient(s)")
+        except Exception:
+            # Drop the session, its state is unknown after a failure
+            self._drop(client)
+            raise
+        self._release(client)
+
+    async def close(self):
+        """
+        Close every idle SMTP session.
+        """
+        while self._idle is not None and not self._idle.empty():
+            client = self._idle.get_nowait()
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except Exception:
+                    client.close()
+
+
+mail_sender = MailSender()
+
+
+async def send_email(meeting_data: dict, summary: str):
     try:
         
-        logger.info("Begin file retrieval from elastic search.")
-
-        meeting_data = elastic_service.retrieve_from_elastic(workspace_name, file_id)
         filename = meeting_data.get("filename")
         participants = meeting_data.get("participants", [])
 
         logger.info(f"Mail Summary: {summary}")
         logger.info(f"Mail Participants: {participants}")
+
+        if not participants:
+            return {"message": "No participants to mail"}
         
         # HTML email template
         email_content = f"""
@@ -41,32 +147,10 @@ def send_email(workspace_name: str, file_id: str, summary: str, elastic_service:
             </html>
         """
 
-        for participant in participants:
-
-            logger.info("Preparing email content...")
-            message = MIMEText(email_content, "html")
-            message["Subject"] = "Metting Takeaways"
-            message["From"] = settings.USERNAME
-            message["To"] = participant
-
-            context = create_default_context()
-            logger.info("Attempting to connect to SMTP server...")
-            with SMTP(settings.HOST, settings.PORT) as server:
-                server.ehlo()
-                server.starttls(context=context)
-                server.login(settings.USERNAME, settings.PASSWORD)
-                logger.info("Connected to SMTP server")
-
-                # Send email to all participants
-                server.sendmail(
-                    from_addr=message["From"],
-                    to_addrs=message["To"],
-                    msg=message.as_string()
-                )
-                logger.info(f"Mail sent successfully to {message['To']}")
-                server.quit()
+        # The content is identical for everyone, so one message goes to all participants
+        logger.info("Preparing email content...")
+        await mail_sender.send(participants, "Metting Takeaways", email_content)
 
         return {"message": "Mail sent successfully"}
     except Exception as e:
         raise e
-    
\ No newline at end of file
@@ -0,0 +1,88 @@
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from prometheus_client import Counter, Histogram
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PIPELINE_STAGES = ["save", "convert", "asr", "diarization", "mapping", "embedding", "summary", "index", "mail"]
+
+STAGE_LATENCY = Histogram(
+    "ally_pipeline_stage_seconds",
+    "Wall-clock duration of each upload processing stage.",
+    ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 3600)
+)
+STAGE_REAL_TIME_FACTOR = Histogram(
+    "ally_pipeline_stage_real_time_factor",
+    "Stage duration divided by the duration of the processed audio.",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+)
+AUDIO_SECONDS_PROCESSED = Counter(
+    "ally_audio_seconds_processed_total",
+    "Seconds of audio that went through the processing pipeline."
+)
+REQUEST_LATENCY = Histogram(
+    "ally_http_request_seconds",
+    "HTTP request latency per route.",
+    ["method", "route", "status"]
+)
+
+
+def observe_stage(stage: str, seconds: float, audio_seconds: Optional[float] = None):
+    """
+    Record the duration of a pipeline stage and, when the audio length is known, its real-time factor.
+
+    Args:
+        stage (str): One of PIPELINE_STAGES.
+        seconds (float): Duration of the stage.
+        audio_seconds (float): Duration of the processed audio.
+    """
+    STAGE_LATENCY.labels(stage=stage).observe(seconds)
+    if audio_seconds:
+        STAGE_REAL_TIME_FACTOR.labels(stage=stage).observe(seconds / audio_seconds)
+
+
+def observe_pipeline(timings: Dict[str, float], audio_seconds: Optional[float] = None):
+    """
+    Record the stage timings reported by a pipeline worker process.
+
+    Args:
+        timings (Dict[str, float]): Seconds spent per stage.
+        audio_seconds (float): Duration of the processed audio.
+    """
+    for stage, seconds in timings.items():
+        observe_stage(stage, seconds, audio_seconds)
+    if audio_seconds:
+        AUDIO_SECONDS_PROCESSED.inc(audio_seconds)
+
+
+@contextmanager
+def record_time(timings: Dict[str, float], stage: str):
+    """
+    Measure a block and store its duration under `stage`.
+
+    Used in worker processes, whose timings are sent back to the API process
+    and observed there, so every metric is exported from a single registry.
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - start_time
+
+
+@contextmanager
+def stage_timer(stage: str, audio_seconds: Optional[float] = None):
+    """
+    Measure a block running in the API process and observe it directly.
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start_time, audio_seconds)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from config.settings import settings
+from models.model_registry import model_registry
+from utils.asr_backends import get_asr_process_threads
+from utils.audio_utils import SAMPLE_RATE, load_pcm_buffer
+from utils.diarization_utils import Diarization, DIARIZATION_MODEL_KEY
+from utils.job_events import JobEventPublisher
+from utils.whisper_utils import transcribe_audio, WHISPER_MODEL_KEY
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def init_stage_worker(num_threads: int, model_key: str):
+    """
+    Initializer of a stage process: pin its torch thread budget.
+
+    Args:
+        num_threads (int): Number of intra-op threads torch may use in this process.
+        model_key (str): Registry key of the model used by the stage.
+    """
+    import torch
+
+    torch.set_num_threads(num_threads)
+    logger.info(f"Stage worker for '{model_key}' started with {num_threads} torch threads.")
+
+
+def warm_stage_model(model_key: str) -> dict:
+    """
+    Load the model of a stage in its process ahead of the first job.
+
+    Returns:
+        dict: Model registry stats of the stage process, with the load time and memory of the model.
+    """
+    model_registry.get(model_key)
+    return model_registry.stats()
+
+
+def create_stage_executor(num_threads: int, model_key: str, max_workers: int = 1) -> ProcessPoolExecutor:
+    """
+    Create an executor dedicated to one pipeline stage.
+
+    Args:
+        num_threads (int): Torch thread budget of every stage process.
+        model_key (str): Registry key of the model used by the stage.
+        max_workers (int): Number of stage processes.
+
+    Returns:
+        ProcessPoolExecutor: Executor whose processes keep the stage model loaded between calls.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_stage_worker,
+        initargs=(num_threads, model_key),
+    )
+
+
+def run_transcription(pcm_path: str, start: int = 0, end: int = None, events: Optional[JobEventPublisher] = None) -> list:
+    on_segment = None
+    if events is not None:
+        offset = start / SAMPLE_RATE
+
+        def on_segment(segment: dict):
+            events.publish("segment", {
+                "start": segment["start"] + offset,
+                "end": segment["end"] + offset,
+                "text": segment["text"]
+            })
+
+    # Slicing the memory map does not copy the samples
+    return transcribe_audio(load_pcm_buffer(pcm_path)[start:end], on_segment)
+
+
+def run_diarization(pcm_path: str, num_participants: Optional[int] = None) -> list:
+    return asyncio.run(Diarization().perform_diarization(load_pcm_buffer(pcm_path), num_participants))
+
+
+def create_transcription_executor() -> ProcessPoolExecutor:
+    return create_stage_executor(get_asr_process_threads(), WHISPER_MODEL_KEY, settings.ASR_WORKERS)
+
+
+def create_diarization_executor() -> ProcessPoolExecutor:
+    return create_stage_executor(settings.DIARIZATION_TORCH_THREADS, DIARIZATION_MODEL_KEY)
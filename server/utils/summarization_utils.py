@@ -1,17 +1,40 @@
-from langchain_groq import ChatGroq
+import time
+import asyncio
 import logging
-from typing import List
-from sentence_transformers import SentenceTransformer
+import numpy as np
+from functools import partial
+from typing import List, Optional, Tuple
 from config import settings
+from models.model_registry import model_registry
+from utils.embedding_cache import EmbeddingCache
+from utils.metrics import record_time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EMBEDDING_MODEL_KEY = "embedding"
+
+
+def load_embedding_model(model_name: str):
+    """
+    Load the SentenceTransformer model used for the transcript chunks.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name)
+    logger.info("Transcript Embedding model initialized successfully.")
+    return model
+
+
 class TranscriptSummarizer:
     def __init__(self, 
                 model_name: str=settings.EMBEDDING_MODEL, 
-                token_limit: int=512, 
+                token_limit: Optional[int]=None, 
                 overlap_tokens: int=50,
+                batch_size: int=settings.EMBEDDING_BATCH_SIZE,
+                map_reduce_threshold: int=settings.SUMMARY_MAP_REDUCE_THRESHOLD,
+                summary_chunk_tokens: int=settings.SUMMARY_CHUNK_TOKENS,
+                summary_concurrency: int=settings.SUMMARY_CONCURRENCY,
                 llm_name=settings.GROQ_LLM_NAME,
                 llm_api_key=settings.GROQ_API_KEY
             ):
@@ -20,23 +43,79 @@ class TranscriptSummarizer:
 
         Args:
             model_name (str): Pretrained embedding model to use.
-            token_limit (int): Maximum number of tokens per chunk.
+            token_limit (int): Maximum number of tokens per chunk, defaults to what the embedding model encodes without truncation.
             overlap_tokens (int): Number of overlapping tokens between chunks.
+            batch_size (int): Number of chunks encoded per forward pass.
+            map_reduce_threshold (int): Transcript length in tokens above which map-reduce summarization is used.
+            summary_chunk_tokens (int): Token budget of each piece summarized in the map step.
+            summary_concurrency (int): Maximum number of concurrent LLM requests.
             llm_name (str): Groq's LLM Name
             llm_api_key: Groq's API KEY.
         """
-        self.embedding_model = SentenceTransformer(model_name)
-        self.tokenizer = self.embedding_model.tokenizer
-        self.token_limit = token_limit
+        self.model_name = model_name
+        # The models are only loaded on first use, see `warm_up`
+        model_registry.register(EMBEDDING_MODEL_KEY, partial(load_embedding_model, model_name))
+        self.llm_name = llm_name
+        self.llm_api_key = llm_api_key
+        self._llm = None
+        self._token_limit = token_limit
         self.overlap_tokens = overlap_tokens
-        logger.info("Transcript Embedding model initialized successfully.")
-        self.llm = ChatGroq(
-            model_name=llm_name,
-            temperature=0.5, 
-            max_tokens=4500,
-            api_key=llm_api_key
+        self.batch_size = batch_size
+        self.map_reduce_threshold = map_reduce_threshold
+        self.summary_chunk_tokens = summary_chunk_tokens
+        self.summary_concurrency = summary_concurrency
+        self.embedding_cache = EmbeddingCache(
+            max_entries=settings.EMBEDDING_CACHE_SIZE,
+            cache_dir=settings.EMBEDDING_CACHE_DIR
         )
-        logger.info(f"GROQ LLM {llm_name} initialized successfully.")
+
+    @property
+    def embedding_model(self):
+        return model_registry.get(EMBEDDING_MODEL_KEY)
+
+    @property
+    def tokenizer(self):
+        return self.embedding_model.tokenizer
+
+    @property
+    def token_limit(self) -> int:
+        """
+        Maximum number of text tokens per chunk.
+
+        Defaults to the model's `max_seq_length` minus the special tokens added by
+        the tokenizer, so `encode` never silently truncates a chunk.
+        """
+        if self._token_limit is None:
+            self._token_limit = self.embedding_model.max_seq_length - self.tokenizer.num_special_tokens_to_add()
+        return self._token_limit
+
+    @property
+    def llm(self):
+        """
+        The Groq chat model, created on first use.
+        """
+        if self._llm is None:
+            from langchain_groq import ChatGroq
+
+            self._llm = ChatGroq(
+                model_name=self.llm_name,
+                temperature=0.5, 
+                max_tokens=4500,
+                api_key=self.llm_api_key
+            )
+            logger.info(f"GROQ LLM {self.llm_name} initialized successfully.")
+        return self._llm
+
+    def warm_up(self) -> dict:
+        """
+        Load the embedding model and create the LLM client ahead of the first request.
+
+        Returns:
+            dict: Whether the embedding model is loaded, by registry key.
+        """
+        self.embedding_model
+        self.llm
+        return {EMBEDDING_MODEL_KEY: model_registry.is_loaded(EMBEDDING_MODEL_KEY)}
 
     def chunk_text(self, text: str) -> List[str]:
         """
@@ -48,33 +127,96 @@ class TranscriptSummarizer:
         Returns:
             List[str]: List of text chunks.
         """
-        tokens = self.tokenizer(text, truncation=False, add_special_tokens=False)["input_ids"]
-        logger.info(f"Text tokenized into {len(tokens)} tokens.")
+        return self.chunk_texts([text])[0]
+
+    def chunk_texts(self, texts: List[str]) -> List[List[str]]:
+        """
+        Chunk several texts with a sliding window of tokens with overlap.
+
+        All texts are tokenized in one batched call. The chunks are sliced from
+        the original strings with the character offsets of their first and last
+        token, so the text is never decoded back from token IDs.
+
+        Args:
+            texts (List[str]): Input texts to chunk.
+
+        Returns:
+            List[List[str]]: The chunks of every text.
+        """
+        if not texts:
+            return []
+        if not self.tokenizer.is_fast:
+            # Only fast tokenizers report offsets, fall back to decoding the windows
+            return [self.chunk_text_by_decoding(text) for text in texts]
 
-        token_chunks = []
-        for i in range(0, len(tokens), self.token_limit - self.overlap_tokens):
-            chunk = tokens[i:i + self.token_limit]
-            token_chunks.append(chunk)
+        stride = self.token_limit - self.overlap_tokens
+        encodings = self.tokenizer(
+            texts, add_special_tokens=False, truncation=False, return_offsets_mapping=True
+        )["offset_mapping"]
 
-        # Decode tokens back into text chunks
-        text_chunks = [self.tokenizer.decode(chunk, skip_special_tokens=True) for chunk in token_chunks]
-        logger.info(f"{len(text_chunks)} chunks generated successfully with overlap.")
-        return text_chunks
+        all_chunks = []
+        for text, offsets in zip(texts, encodings):
+            all_chunks.append([
+                text[offsets[i][0]:offsets[min(i + self.token_limit, len(offsets)) - 1][1]]
+                for i in range(0, len(offsets), stride)
+            ])
+        logger.debug(f"{sum(map(len, all_chunks))} chunks generated from {len(texts)} texts.")
+        return all_chunks
 
-    def generate_embeddings(self, text_chunks: List[str]) -> List[float]:
+    def chunk_text_by_decoding(self, text: str) -> List[str]:
+        """
+        Chunk text by decoding windows of token IDs, for tokenizers without offset mappings.
+        """
+        tokens = self.tokenizer(text, truncation=False, add_special_tokens=False)["input_ids"]
+        stride = self.token_limit - self.overlap_tokens
+        return [
+            self.tokenizer.decode(tokens[i:i + self.token_limit], skip_special_tokens=True)
+            for i in range(0, len(tokens), stride)
+        ]
+
+    def generate_embeddings(self, text_chunks: List[str]) -> np.ndarray:
         """
         Generate embeddings for the input text chunks.
 
+        Chunks already seen by this model are served from the embedding cache;
+        only the remaining ones are encoded. SentenceTransformer sorts the inputs
+        by length before batching, so chunks of similar length share a batch and
+        padding stays minimal.
+
         Args:
             text_chunks (list): List of text chunks.
 
         Returns:
-            list: List of embeddings.
+            np.ndarray: Matrix of embeddings, one row per chunk.
         """
-        embeddings = self.embedding_model.encode(text_chunks, batch_size=8, show_progress_bar=True)
-        return embeddings
+        if not text_chunks:
+            return np.zeros((0, self.embedding_model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        keys = [EmbeddingCache.make_key(self.model_name, chunk) for chunk in text_chunks]
+        cached = self.embedding_cache.get_many(keys)
+
+        # Encode every distinct uncached chunk once
+        missing = {key: chunk for key, chunk in zip(keys, text_chunks) if key not in cached}
+        if missing:
+            start_time = time.perf_counter()
+            encoded = self.embedding_model.encode(
+                list(missing.values()),
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+            logger.info(f"Encoded {len(missing)} chunks in {time.perf_counter() - start_time:.2f}s")
+            computed = dict(zip(missing.keys(), encoded))
+            self.embedding_cache.put_many(computed)
+            cached.update(computed)
+
+        logger.info(
+            f"Embedding cache: {len(text_chunks) - len(missing)}/{len(text_chunks)} chunks served from cache, "
+            f"totals {self.embedding_cache.stats()}"
+        )
+        return np.stack([cached[key] for key in keys])
 
-    def process_and_summarize_transcript(self, formatted_segments) -> dict:
+    async def process_and_summarize_transcript(self, formatted_segments) -> dict:
         """
         Process the formatted segments and generate a summary for the entire transcript.
 
@@ -82,55 +224,62 @@ class TranscriptSummarizer:
             formatted_segments (list): List of segments with start, end, speaker, and text.
 
         Returns:
-            dict: A dictionary containing the summary and embeddings.
+            dict: A dictionary containing the summary, transcript, segments and embeddings.
         """
 
-        all_segment_embeddings = []
-        full_transcript = ""
+        all_chunks = []
+        chunk_segments = []
         enriched_segments = []
 
-        # Process each segment and generate chunk embeddings
-        for segment in formatted_segments:
-            start = segment['start']
-            end = segment['end']
-            speaker = segment['speaker']
-            text = segment['text']
-            
-            # Chunk the text
-            logger.info(f"Processing segment: {speaker} from {start} to {end}")
-            text_chunks = self.chunk_text(text)
-            
-            # Generate embeddings for each chunk
-            embeddings = self.generate_embeddings(text_chunks)
-            logger.info("Embedding(s) generated successfully.")
-            
-            # Store the segment embeddings along with the start and end times
-            for idx, chunk in enumerate(text_chunks):
-                segment_embedding = {
-                    "start": start,
-                    "end": end,
-                    "chunk": chunk,
-                    "embedding": embeddings[idx]
-                }
-                all_segment_embeddings.append(segment_embedding)
+        # Gather the chunks of every segment so they can be encoded in one pass
+        segment_chunks = self.chunk_texts([segment['text'] for segment in formatted_segments])
+        for segment, text_chunks in zip(formatted_segments, segment_chunks):
+            all_chunks.extend(text_chunks)
+            chunk_segments.extend([segment] * len(text_chunks))
 
             # Add speaker info to the text for context
-            enriched_segments.append(f"{speaker}: {text}")
+            enriched_segments.append(f"{segment['speaker']}: {segment['text']}")
+
+        logger.info(f"Generating embeddings for {len(all_chunks)} chunks from {len(formatted_segments)} segments...")
+        timings = {}
+        with record_time(timings, "embedding"):
+            embeddings = self.generate_embeddings(all_chunks) if all_chunks else []
+        logger.info("Embedding(s) generated successfully.")
+
+        # Scatter the embeddings back to their segments along with the start and end times
+        all_segment_embeddings = [
+            {
+                "start": segment['start'],
+                "end": segment['end'],
+                "speaker": segment['speaker'],
+                "chunk": chunk,
+                "embedding": embedding
+            }
+            for segment, chunk, embedding in zip(chunk_segments, all_chunks, embeddings)
+        ]
         
         # Combine enriched segments into one full transcript text
         full_transcript = " ".join(enriched_segments)
 
-        # Generate the summary by passing the full transcript to the LLM
-        logger.info("Generating summary using LLM...")
-        summary = self.generate_summary(full_transcript)
+        # Long transcripts are summarized piecewise, short ones in a single LLM call
+        with record_time(timings, "summary"):
+            token_counts = self.count_tokens(enriched_segments)
+            if sum(token_counts) > self.map_reduce_threshold:
+                logger.info(f"Generating map-reduce summary for {sum(token_counts)} tokens using LLM...")
+                summary = await self.generate_map_reduce_summary(enriched_segments, token_counts)
+            else:
+                logger.info("Generating summary using LLM...")
+                summary = await self.generate_summary(full_transcript)
 
         return {
             "summary": summary,
             "transcript":full_transcript,
-            "embeddings": all_segment_embeddings
+            "segments": formatted_segments,
+            "embeddings": all_segment_embeddings,
+            "timings": timings
         }
     
-    def generate_summary(self, context: str):
+    async def generate_summary(self, context: str):
     
         """
         Generate final summary from the provided context.
@@ -148,7 +297,126 @@ class TranscriptSummarizer:
             Ensure the summary is clear and retains the main points of the text.
           """)
         # Invoke the LLM with the prompt
-        summary = self.llm.invoke(prompt)
+        summary = await self.llm.ainvoke(prompt)
+        return summary.content
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Count the tokens of several texts with one batched tokenizer call.
+        """
+        if not texts:
+            return []
+        return [len(ids) for ids in self.tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    def split_long_texts(self, texts: List[str], token_counts: List[int]) -> Tuple[List[str], List[int]]:
+        """
+        Split every text longer than the summary token budget into consecutive parts within it.
+
+        A speaker turn can exceed the budget on its own, e.g. a presentation, since the
+        alignment merges consecutive segments of the same speaker.
+
+        Args:
+            texts (List[str]): Transcript segments or partial summaries, in order.
+            token_counts (List[int]): Token count of every text.
+
+        Returns:
+            tuple: The texts and their token counts, none above `summary_chunk_tokens`.
+        """
+        budget = self.summary_chunk_tokens
+        long_texts = [text for text, count in zip(texts, token_counts) if count > budget]
+        if not long_texts:
+            return texts, token_counts
+
+        if self.tokenizer.is_fast:
+            # Slice the original strings at the token offsets, as in `chunk_texts`
+            encodings = iter(self.tokenizer(
+                long_texts, add_special_tokens=False, truncation=False, return_offsets_mapping=True
+            )["offset_mapping"])
+        else:
+            encodings = iter(self.tokenizer(long_texts, add_special_tokens=False, truncation=False)["input_ids"])
+
+        split_texts, split_counts = [], []
+        for text, count in zip(texts, token_counts):
+            if count <= budget:
+                split_texts.append(text)
+                split_counts.append(count)
+                continue
+            tokens = next(encodings)
+            for i in range(0, len(tokens), budget):
+                window = tokens[i:i + budget]
+                if self.tokenizer.is_fast:
+                    split_texts.append(text[window[0][0]:window[-1][1]])
+                else:
+                    split_texts.append(self.tokenizer.decode(window, skip_special_tokens=True))
+                split_counts.append(len(window))
+        return split_texts, split_counts
+
+    def split_by_token_budget(self, texts: List[str], token_counts: List[int]) -> List[str]:
+        """
+        Group consecutive texts into pieces that fit the summary token budget.
+
+        Args:
+            texts (List[str]): Transcript segments or partial summaries, in order.
+            token_counts (List[int]): Token count of every text.
+
+        Returns:
+            List[str]: Pieces of at most `summary_chunk_tokens` tokens.
+        """
+        texts, token_counts = self.split_long_texts(texts, token_counts)
+        pieces, current, current_tokens = [], [], 0
+        for text, count in zip(texts, token_counts):
+            if current and current_tokens + count > self.summary_chunk_tokens:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += count
+        if current:
+            pieces.append(" ".join(current))
+        return pieces
+
+    async def generate_map_reduce_summary(self, texts: List[str], token_counts: List[int]) -> str:
+        """
+        Summarize a long transcript hierarchically.
+
+        The texts are split by token budget and the pieces are summarized concurrently,
+        at most `summary_concurrency` requests at a time. The partial summaries are
+        reduced again the same way until they fit into one final summary call.
+
+        Args:
+            texts (List[str]): Transcript segments in order.
+            token_counts (List[int]): Token count of every segment.
+
+        Returns:
+            str: Summary of the file.
+        """
+        pieces = self.split_by_token_budget(texts, token_counts)
+        semaphore = asyncio.Semaphore(self.summary_concurrency)
+
+        async def summarize_piece(piece: str) -> str:
+            prompt = (f"""
+                The following is one part of a longer meeting transcript.
+                Summarize it concisely, keeping the decisions, action items and main points:\n\n {piece}
+              """)
+            async with semaphore:
+                response = await self.llm.ainvoke(prompt)
+            return response.content
+
+        logger.info(f"Summarizing {len(pieces)} transcript pieces concurrently...")
+        partial_summaries = await asyncio.gather(*(summarize_piece(piece) for piece in pieces))
+
+        # Add another level while the partial summaries are too long for one call,
+        # as long as regrouping them still reduces the number of pieces
+        partial_counts = self.count_tokens(partial_summaries)
+        if sum(partial_counts) > self.map_reduce_threshold \
+                and len(self.split_by_token_budget(partial_summaries, partial_counts)) < len(pieces):
+            return await self.generate_map_reduce_summary(partial_summaries, partial_counts)
+
+        prompt = (f"""
+            The following are summaries of consecutive parts of one meeting.
+            Combine them into a single clear and concise summary of the whole meeting,
+            focusing on the topics and retaining the main points:\n\n {chr(10).join(partial_summaries)}
+          """)
+        summary = await self.llm.ainvoke(prompt)
         return summary.content
 
 summarizer=TranscriptSummarizer()
@@ -0,0 +1,117 @@
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from utils.audio_utils import SAMPLE_RATE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def frame_energy_db(audio: np.ndarray, frame_samples: int) -> np.ndarray:
+    """
+    Compute the energy of consecutive non-overlapping frames in decibels.
+
+    Args:
+        audio (np.ndarray): Mono float32 samples.
+        frame_samples (int): Number of samples per frame.
+
+    Returns:
+        np.ndarray: Energy of every full frame in dB.
+    """
+    num_frames = len(audio) // frame_samples
+    frames = np.asarray(audio[:num_frames * frame_samples], dtype=np.float32).reshape(num_frames, frame_samples)
+    power = np.einsum("ij,ij->i", frames, frames) / frame_samples
+    return 10 * np.log10(power + 1e-10)
+
+
+def find_silences(
+        audio: np.ndarray,
+        frame_ms: int = settings.VAD_FRAME_MS,
+        threshold_db: float = settings.VAD_THRESHOLD_DB,
+        min_silence_seconds: float = settings.VAD_MIN_SILENCE_SECONDS
+    ) -> Tuple[List[Tuple[int, int]], np.ndarray]:
+    """
+    Find the silences of a recording with an energy based voice activity detector.
+
+    A frame is silent when its energy is more than `threshold_db` below the
+    loudest frame, so the detector adapts to the recording level.
+
+    Args:
+        audio (np.ndarray): Mono 16 kHz float32 samples.
+        frame_ms (int): Frame length in milliseconds.
+        threshold_db (float): Distance to the loudest frame below which a frame is silent.
+        min_silence_seconds (float): Minimum duration of a silence.
+
+    Returns:
+        tuple: Silences as (start, end) sample ranges, and the per-frame speech mask.
+    """
+    frame_samples = SAMPLE_RATE * frame_ms // 1000
+    energy = frame_energy_db(audio, frame_samples)
+    if len(energy) == 0:
+        return [], np.zeros(0, dtype=bool)
+
+    speech = energy > energy.max() - threshold_db
+
+    # Boundaries of the runs of silent frames
+    padded = np.concatenate(([False], ~speech, [False]))
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    run_starts, run_ends = changes[::2], changes[1::2]
+
+    min_frames = max(1, int(min_silence_seconds * 1000 / frame_ms))
+    silences = [
+        (start * frame_samples, end * frame_samples)
+        for start, end in zip(run_starts, run_ends)
+        if end - start >= min_frames
+    ]
+    return silences, speech
+
+
+def split_on_silence(
+        audio: np.ndarray,
+        min_window_seconds: float = settings.ASR_MIN_WINDOW_SECONDS,
+        max_window_seconds: float = settings.ASR_MAX_WINDOW_SECONDS
+    ) -> List[Tuple[int, int]]:
+    """
+    Split a recording into windows that start and end in silences.
+
+    Each window is cut at the middle of the last silence that keeps it shorter
+    than `max_window_seconds`, so no word is split between two windows. A window
+    without any silence in range is cut at the maximum length. Windows without
+    speech are dropped.
+
+    Args:
+        audio (np.ndarray): Mono 16 kHz float32 samples.
+        min_window_seconds (float): Windows are not cut before this length.
+        max_window_seconds (float): Maximum window length.
+
+    Returns:
+        List[Tuple[int, int]]: Windows as (start, end) sample ranges.
+    """
+    total = len(audio)
+    max_window = int(max_window_seconds * SAMPLE_RATE)
+    if total <= max_window:
+        return [(0, total)] if total else []
+
+    silences, speech = find_silences(audio)
+    cut_points = np.array([(start + end) // 2 for start, end in silences], dtype=np.int64)
+    frame_samples = SAMPLE_RATE * settings.VAD_FRAME_MS // 1000
+
+    windows = []
+    start = 0
+    while start < total:
+        end = min(start + max_window, total)
+        if end < total:
+            # Last silence between the minimum and the maximum window length
+            candidates = cut_points[(cut_points >= start + min_window_seconds * SAMPLE_RATE) & (cut_points <= end)]
+            if len(candidates):
+                end = int(candidates[-1])
+
+        if speech[start // frame_samples:max(end // frame_samples, start // frame_samples + 1)].any():
+            windows.append((start, end))
+        start = end
+
+    logger.info(f"Split {total / SAMPLE_RATE:.1f}s of audio into {len(windows)} windows at {len(silences)} silences.")
+    return windows
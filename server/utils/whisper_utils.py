@@ -1,19 +1,61 @@
-import os 
-import whisper
 import logging
-import datetime
+import numpy as np
+from typing import Callable, Dict, List, Optional
 
-from fastapi import UploadFile
+from config.settings import settings
+from models.model_registry import model_registry
+from utils.asr_backends import create_asr_backend
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def transcribe_audio(file_path: str) -> str:
-    
-    start_time = datetime.datetime.now()
-    
-    logger.info(f"Begining transcription \n Time:{start_time}")
-    model = whisper.load_model("medium")
-    result = model.transcribe(file_path, verbose=True)
-    logger.info(f"Trasncription completed \n Time taken for execution: {datetime.datetime.now() - start_time}")
-    return result["segments"]
+WHISPER_MODEL_KEY = "whisper"
+
+
+def load_whisper_model():
+    """
+    Load the ASR backend selected through ASR_BACKEND with the WHISPER_MODEL_NAME model.
+    """
+    return create_asr_backend(settings.ASR_BACKEND).load()
+
+
+model_registry.register(WHISPER_MODEL_KEY, load_whisper_model)
+
+
+def transcribe_audio(audio: np.ndarray, on_segment: Optional[Callable[[Dict], None]] = None) -> list:
+    """
+    Transcribe audio with the registered ASR backend.
+
+    Args:
+        audio (np.ndarray): 16 kHz float32 samples.
+        on_segment (Callable): Called with every segment as soon as it is decoded.
+
+    Returns:
+        list: Whisper segments with `start`, `end` and `text`.
+    """
+    backend = model_registry.get(WHISPER_MODEL_KEY)
+    return backend.transcribe(audio, on_segment)
+
+
+def stitch_segments(window_segments: List[list], offsets: List[float]) -> list:
+    """
+    Join the segments of separately transcribed windows into one transcript.
+
+    Args:
+        window_segments (List[list]): Segments of every window, in window order.
+        offsets (List[float]): Start of every window in the recording, in seconds.
+
+    Returns:
+        list: Segments with timestamps relative to the start of the recording.
+    """
+    stitched = []
+    for segments, offset in zip(window_segments, offsets):
+        for segment in segments:
+            segment = dict(segment, id=len(stitched), start=segment["start"] + offset, end=segment["end"] + offset)
+            if segment.get("words"):
+                segment["words"] = [
+                    dict(word, start=word["start"] + offset, end=word["end"] + offset)
+                    for word in segment["words"]
+                ]
+            stitched.append(segment)
+    return stitched
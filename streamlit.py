@@ -1,3 +1,5 @@
+import json
+
 import streamlit as st
 import requests
 
@@ -63,13 +65,22 @@ def list_workspaces():
 # Fetch files from the selected workspace
 def fetch_files(workspace_id):
     """Fetches the list of files for the selected workspace."""
-    response = requests.get(f"{API_URL}/file/list", params={"workspace_name": workspace_id})
-    if response.status_code == 200:
-        files = response.json()
-        return files
-    else:
-        st.error(f"Failed to fetch files: {response.text}")
-        return []
+    files = []
+    cursor = None
+    while True:
+        params = {"workspace_name": workspace_id}
+        if cursor:
+            params["cursor"] = cursor
+        response = requests.get(f"{API_URL}/file/list", params=params)
+        if response.status_code != 200:
+            break
+        page = response.json()
+        files.extend(page["files"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return files
+    st.error(f"Failed to fetch files: {response.text}")
+    return []
 
 # Main Streamlit App Layout
 st.title("Audio-Video Transcript Manager")
@@ -86,6 +97,45 @@ with col2:
     st.subheader("List Workspace")
     list_workspaces()
 
+def read_events(response):
+    """
+    Parse a server-sent event stream into (event, data) pairs.
+    """
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data) or "{}")
+            event, data = None, []
+
+def stream_job(job):
+    """
+    Show the transcript, speakers and summary of a job while it is processed.
+    """
+    status = st.empty()
+    transcript = st.empty()
+    segments = []
+    with requests.get(f"{API_URL}/jobs/{job['job_id']}/events", stream=True) as response:
+        for event, data in read_events(response):
+            if event == "stage":
+                status.info(f"{data['stage'].capitalize()}: {data['status']}")
+            elif event == "segment":
+                segments.append(data)
+                transcript.text("\n".join(f"[{s['start']:.1f}s] {s['text'].strip()}" for s in segments))
+            elif event == "speakers":
+                transcript.text("\n".join(
+                    f"[{s['start']:.1f}s] {s['speaker']}: {s['text'].strip()}" for s in data["segments"]
+                ))
+            elif event == "summary":
+                st.markdown(f"**Summary:** {data['summary']}")
+            elif event == "completed":
+                status.success(f"Processed {job['filename']}.")
+            elif event == "failed":
+                status.error(f"Failed to process {job['filename']}: {data['error']}")
+
 # Step 2: Upload File
 if "selected_workspace_id" in st.session_state and st.session_state.selected_workspace_id:
     st.header("2. Upload File")
@@ -117,6 +167,11 @@ if "selected_workspace_id" in st.session_state and st.session_state.selected_wor
                 )
 
                 if response.status_code == 200:
+                    # Uploads are processed asynchronously, follow the partial results of every job
+                    for job in response.json():
+                        st.subheader(job["filename"])
+                        stream_job(job)
+
                     st.success(f"File(s) uploaded successfully!")
                     
                     # Refresh the file list after upload